@@ -22,7 +22,11 @@ logging.basicConfig(
 logger = logging.getLogger("db_integrity")
 
 try:
-    from familybot.lib.database import DATABASE_FILE, get_db_connection
+    from familybot.lib.database import (
+        DATABASE_FILE,
+        close_db_connection,
+        get_db_connection,
+    )
 except ImportError:
     print(
         "❌ Could not import familybot modules. Make sure you are in the project root."
@@ -38,10 +42,8 @@ def check_database_integrity():
         logger.error("Database file does not exist.")
         return False
 
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = get_db_connection().cursor()
 
         # 1. Quick Check
         logger.info("Running PRAGMA quick_check...")
@@ -110,8 +112,7 @@ def check_database_integrity():
         logger.error(f"Unexpected error: {e}")
         return False
     finally:
-        if conn:
-            conn.close()
+        close_db_connection()
 
 
 if __name__ == "__main__":
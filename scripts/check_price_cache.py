@@ -138,8 +138,7 @@ def _print_summary(cursor):
 
 def check_price_cache():
     """Check game_details_cache and itad_price_cache tables."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    cursor = get_db_connection().cursor()
 
     try:
         now = datetime.now(UTC).isoformat().replace("+00:00", "Z")
@@ -148,7 +147,7 @@ def check_price_cache():
         _print_itad_price_cache(cursor, now)
         _print_summary(cursor)
     finally:
-        conn.close()
+        cursor.close()
 
 
 if __name__ == "__main__":
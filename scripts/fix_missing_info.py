@@ -35,24 +35,20 @@ async def fix_missing_names():
     """Identifies and fixes 'Unknown' or NULL names in itad_price_cache."""
     logger.info("Starting itad_price_cache name fix...")
 
-    conn = get_db_connection()
+    cursor = get_db_connection().cursor()
     try:
-        cursor = conn.cursor()
-        try:
-            # Find problematic entries in itad_price_cache
-            cursor.execute("""
-                SELECT appid, steam_game_name
-                FROM itad_price_cache
-                WHERE steam_game_name IS NULL
-                   OR steam_game_name = ''
-                   OR steam_game_name LIKE 'Unknown Game%'
-            """)
-
-            problematic_rows = cursor.fetchall()
-        finally:
-            cursor.close()
+        # Find problematic entries in itad_price_cache
+        cursor.execute("""
+            SELECT appid, steam_game_name
+            FROM itad_price_cache
+            WHERE steam_game_name IS NULL
+               OR steam_game_name = ''
+               OR steam_game_name LIKE 'Unknown Game%'
+        """)
+
+        problematic_rows = cursor.fetchall()
     finally:
-        conn.close()
+        cursor.close()
 
     if not problematic_rows:
         logger.info("✅ No problematic game names found in itad_price_cache.")
@@ -151,25 +147,21 @@ def check_game_details_cache():
     """Check game_details_cache for missing or problematic entries."""
     logger.info("Checking game_details_cache for missing info...")
 
-    conn = get_db_connection()
+    cursor = get_db_connection().cursor()
     try:
-        cursor = conn.cursor()
-        try:
-            # Find entries with NULL or empty names
-            cursor.execute("""
-                SELECT appid, name, type
-                FROM game_details_cache
-                WHERE name IS NULL
-                   OR name = ''
-                   OR name LIKE 'Unknown%'
-                   OR name LIKE 'App %'
-            """)
-
-            problematic_rows = cursor.fetchall()
-        finally:
-            cursor.close()
+        # Find entries with NULL or empty names
+        cursor.execute("""
+            SELECT appid, name, type
+            FROM game_details_cache
+            WHERE name IS NULL
+               OR name = ''
+               OR name LIKE 'Unknown%'
+               OR name LIKE 'App %'
+        """)
+
+        problematic_rows = cursor.fetchall()
     finally:
-        conn.close()
+        cursor.close()
 
     if not problematic_rows:
         logger.info("✅ No problematic entries found in game_details_cache.")
@@ -185,23 +177,19 @@ def check_family_library_cache():
     """Check family_library_cache for missing info."""
     logger.info("Checking family_library_cache for missing info...")
 
-    conn = get_db_connection()
+    cursor = get_db_connection().cursor()
     try:
-        cursor = conn.cursor()
-        try:
-            # Find entries with NULL owner_steamids
-            cursor.execute("""
-                SELECT appid, owner_steamids, exclude_reason
-                FROM family_library_cache
-                WHERE owner_steamids IS NULL
-                   OR owner_steamids = ''
-            """)
-
-            problematic_rows = cursor.fetchall()
-        finally:
-            cursor.close()
+        # Find entries with NULL owner_steamids
+        cursor.execute("""
+            SELECT appid, owner_steamids, exclude_reason
+            FROM family_library_cache
+            WHERE owner_steamids IS NULL
+               OR owner_steamids = ''
+        """)
+
+        problematic_rows = cursor.fetchall()
     finally:
-        conn.close()
+        cursor.close()
 
     if not problematic_rows:
         logger.info("✅ No problematic entries found in family_library_cache.")
@@ -218,23 +206,19 @@ def check_steam_itad_mapping():
     """Check steam_itad_mapping for missing ITAD IDs."""
     logger.info("Checking steam_itad_mapping for missing info...")
 
-    conn = get_db_connection()
+    cursor = get_db_connection().cursor()
     try:
-        cursor = conn.cursor()
-        try:
-            # Find entries with NULL or empty itad_id
-            cursor.execute("""
-                SELECT appid, itad_id
-                FROM steam_itad_mapping
-                WHERE itad_id IS NULL
-                   OR itad_id = ''
-            """)
-
-            problematic_rows = cursor.fetchall()
-        finally:
-            cursor.close()
+        # Find entries with NULL or empty itad_id
+        cursor.execute("""
+            SELECT appid, itad_id
+            FROM steam_itad_mapping
+            WHERE itad_id IS NULL
+               OR itad_id = ''
+        """)
+
+        problematic_rows = cursor.fetchall()
     finally:
-        conn.close()
+        cursor.close()
 
     if not problematic_rows:
         logger.info("✅ No problematic entries found in steam_itad_mapping.")
@@ -260,25 +244,21 @@ async def fix_game_details_cache_names():
     appids = [appid for appid, _, _ in problematic_rows]
     appid_name_mapping = {}
 
-    conn = get_db_connection()
+    cursor = get_db_connection().cursor()
     try:
-        cursor = conn.cursor()
-        try:
-            # Build placeholders for IN clause
-            placeholders = ",".join("?" * len(appids))
-            cursor.execute(
-                f"SELECT appid, steam_game_name FROM itad_price_cache WHERE appid IN ({placeholders})",
-                appids,
-            )
-            for row in cursor.fetchall():
-                if row["steam_game_name"] and not row["steam_game_name"].startswith(
-                    "Unknown"
-                ):
-                    appid_name_mapping[row["appid"]] = row["steam_game_name"]
-        finally:
-            cursor.close()
+        # Build placeholders for IN clause
+        placeholders = ",".join("?" * len(appids))
+        cursor.execute(
+            f"SELECT appid, steam_game_name FROM itad_price_cache WHERE appid IN ({placeholders})",
+            appids,
+        )
+        for row in cursor.fetchall():
+            if row["steam_game_name"] and not row["steam_game_name"].startswith(
+                "Unknown"
+            ):
+                appid_name_mapping[row["appid"]] = row["steam_game_name"]
     finally:
-        conn.close()
+        cursor.close()
 
     for appid, current_name, game_type in problematic_rows:
         found_name = None
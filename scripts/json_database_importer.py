@@ -29,7 +29,7 @@ from typing import Any
 # Add the src directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from familybot.lib.database import get_db_connection, init_db
+from familybot.lib.database import get_db_connection, get_write_connection, init_db
 from familybot.lib.game_details_repository import cache_game_details
 
 # Configure logging
@@ -67,8 +67,7 @@ class JSONDatabaseImporter:
         users: dict[str, Any] = {"discord_ids": {}, "steam_ids": {}}
 
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
+            cursor = get_db_connection().cursor()
 
             # Get users table
             cursor.execute("SELECT discord_id, steam_id FROM users")
@@ -88,7 +87,7 @@ class JSONDatabaseImporter:
                 }
 
             users["family_members"] = family_members
-            conn.close()
+            cursor.close()
 
             self.log_action(
                 f"Loaded {len(users['discord_ids'])} users and {len(family_members)} family members",
@@ -204,14 +203,12 @@ class JSONDatabaseImporter:
             )
         else:
             try:
-                conn = get_db_connection()
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT OR REPLACE INTO users (discord_id, steam_id) VALUES (?, ?)",
-                    (discord_id, steam_id),
-                )
-                conn.commit()
-                conn.close()
+                with get_write_connection() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO users (discord_id, steam_id) VALUES (?, ?)",
+                        (discord_id, steam_id),
+                    )
+                    conn.commit()
                 self.log_action(f"Added user: Discord {discord_id} -> Steam {steam_id}")
 
                 # Update our tracking
@@ -257,14 +254,12 @@ class JSONDatabaseImporter:
             )
         else:
             try:
-                conn = get_db_connection()
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT OR REPLACE INTO family_members (steam_id, friendly_name, discord_id) VALUES (?, ?, ?)",
-                    (steam_id, friendly_name, discord_id),
-                )
-                conn.commit()
-                conn.close()
+                with get_write_connection() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO family_members (steam_id, friendly_name, discord_id) VALUES (?, ?, ?)",
+                        (steam_id, friendly_name, discord_id),
+                    )
+                    conn.commit()
                 self.log_action(
                     f"Added family member: {friendly_name} (Steam {steam_id})"
                 )
@@ -299,14 +294,12 @@ class JSONDatabaseImporter:
             self.log_action(f"[DRY RUN] Would add saved game: {appid}")
         else:
             try:
-                conn = get_db_connection()
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT OR REPLACE INTO saved_games (appid, detected_at) VALUES (?, ?)",
-                    (appid, detected_at),
-                )
-                conn.commit()
-                conn.close()
+                with get_write_connection() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO saved_games (appid, detected_at) VALUES (?, ?)",
+                        (appid, detected_at),
+                    )
+                    conn.commit()
                 self.log_action(f"Added saved game: {appid}")
 
             except Exception as e:
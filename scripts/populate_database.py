@@ -1,13 +1,13 @@
 import os
 import sys
 import random
-import json
 import argparse
 import asyncio
 import logging
 from datetime import datetime
 from typing import Any, Callable, Optional
 import httpx
+import orjson
 
 from steam.webapi import WebAPI
 
@@ -16,6 +16,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
 from familybot.config import STEAMWORKS_API_KEY, ITAD_API_KEY  # pylint: disable=wrong-import-position
 from familybot.lib.database import (
+    close_db_connection,
     get_db_connection,
     init_db,
 )
@@ -23,7 +24,8 @@ from familybot.lib.family_library_repository import cache_family_library
 from familybot.lib.family_utils import get_family_game_list_url  # pylint: disable=wrong-import-position
 from familybot.lib.game_details_repository import (
     cache_game_details,
-    get_cached_game_details,
+    cache_game_details_bulk,
+    get_cached_appids,
 )
 from familybot.lib.logging_config import setup_script_logging  # pylint: disable=wrong-import-position
 from familybot.lib.steam_itad_mapping_repository import (
@@ -32,12 +34,15 @@ from familybot.lib.steam_itad_mapping_repository import (
 )
 from familybot.lib.user_games_repository import cache_user_games
 from familybot.lib.user_repository import load_family_members_from_db
-from familybot.lib.utils import TokenBucket  # pylint: disable=wrong-import-position
+from familybot.lib.utils import (  # pylint: disable=wrong-import-position
+    TokenBucket,
+    parse_retry_after,
+)
 from familybot.lib.wishlist_repository import (
     cache_wishlist,
     get_cached_wishlist,
 )
-from familybot.lib.wishlist_service import add_to_wishlist  # pylint: disable=wrong-import-position
+from familybot.lib.wishlist_service import add_to_wishlist_index  # pylint: disable=wrong-import-position
 
 try:
     from tqdm import tqdm
@@ -54,6 +59,9 @@ logger = setup_script_logging("populate_database", "INFO")
 # Suppress verbose HTTP request logging from httpx
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
+# Store appdetails endpoint; only the app ID varies between requests
+APPDETAILS_URL = "https://store.steampowered.com/api/appdetails?cc=us&l=en&appids="
+
 
 class DatabasePopulator:
     """Handles database population with token bucket rate limiting and async processing."""
@@ -78,7 +86,16 @@ class DatabasePopulator:
         self.max_retries = 3
         self.base_backoff = 1.0
 
-        self.client = httpx.AsyncClient(timeout=15.0)
+        # HTTP/2 lets the appdetails flood share a few multiplexed connections
+        self.client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(15.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=200,
+                max_keepalive_connections=50,
+                keepalive_expiry=60.0,
+            ),
+        )
 
         self._app_list_cache = None
         self._app_list_lock = asyncio.Lock()
@@ -99,8 +116,11 @@ class DatabasePopulator:
         print(f"   Retry policy: {self.max_retries} retries with exponential backoff")
 
     async def close(self):
-        """Closes the httpx client session."""
+        """Closes the httpx client session and releases the pooled DB connection."""
         await self.client.aclose()
+        # Every cache read/write in this run shares the thread-local connection from
+        # get_db_connection(); close it once at the end instead of per call.
+        close_db_connection()
 
     async def make_request_with_retry(
         self,
@@ -120,10 +140,6 @@ class DatabasePopulator:
                 # Acquire token from bucket
                 await bucket.acquire()
 
-                # Add jitter to prevent synchronized requests
-                jitter = random.uniform(0, 0.1)
-                await asyncio.sleep(jitter)
-
                 # Make the request
                 # Only pass timeout if explicitly provided, otherwise use client default (15.0s)
                 request_kwargs: dict[str, Any] = {"params": params, "headers": headers}
@@ -139,10 +155,16 @@ class DatabasePopulator:
 
                 # Check for rate limiting
                 if response.status_code == 429:
+                    bucket.on_congestion()
                     if attempt < self.max_retries:
-                        backoff_time = self.base_backoff * (
-                            2**attempt
-                        ) + random.uniform(0, 1)
+                        # Prefer the server's Retry-After, else full-jitter backoff
+                        backoff_time = parse_retry_after(
+                            response.headers.get("Retry-After")
+                        )
+                        if backoff_time is None:
+                            backoff_time = random.uniform(
+                                0, self.base_backoff * (2**attempt)
+                            )
                         logger.warning(
                             "Rate limited (429), retrying in %.1fs (attempt %d/%d)",
                             backoff_time,
@@ -154,11 +176,12 @@ class DatabasePopulator:
                     logger.error("Max retries exceeded for %s", url)
                     return None
 
+                bucket.on_success()
                 return response
 
             except (httpx.RequestError, httpx.TimeoutException, OSError) as e:
                 if attempt < self.max_retries:
-                    backoff_time = self.base_backoff * (2**attempt)
+                    backoff_time = random.uniform(0, self.base_backoff * (2**attempt))
                     logger.warning(
                         "Request failed: %s, retrying in %.1f s", e, backoff_time
                     )
@@ -175,7 +198,7 @@ class DatabasePopulator:
         """Handle API responses with error checking and enhanced logging."""
         try:
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 429:
                 logger.warning("Rate limited for %s", api_name)
@@ -185,7 +208,7 @@ class DatabasePopulator:
         except httpx.RequestError as e:
             logger.error("Request error for %s: %s", api_name, e)
             return None
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error("JSON decode error for %s: %s", api_name, e)
             return None
         except (ValueError, TypeError, KeyError) as e:
@@ -197,33 +220,19 @@ class DatabasePopulator:
         if not games_data:
             return 0
 
-        conn = get_db_connection()
-        written = 0
-        cursor = None
         try:
-            cursor = conn.cursor()
-            cursor.execute("BEGIN TRANSACTION")
-            batch_written = 0
-            for app_id, data in games_data.items():
-                cache_game_details(app_id, data, permanent=False, conn=conn)
-                batch_written += 1
-            conn.commit()
-            written += batch_written
+            return cache_game_details_bulk(list(games_data.items()), permanent=False)
         except Exception as e:
-            conn.rollback()
             logger.error("Batch write failed: %s", e)
             # Fallback to individual writes to save what we can
+            written = 0
             for app_id, data in games_data.items():
                 try:
                     cache_game_details(app_id, data, permanent=False)
                     written += 1
                 except Exception:
                     pass
-        finally:
-            if cursor is not None:
-                cursor.close()
-            # Do not close the shared connection from get_db_connection()
-        return written
+            return written
 
     async def get_fallback_game_info(self, app_id: str) -> dict:
         """Get basic game info using multiple fallback strategies for games without store pages."""
@@ -311,7 +320,7 @@ class DatabasePopulator:
         return None
 
     def load_family_members(self) -> dict[str, str]:
-        """Load family members from database."""
+        """Load family members from database using the shared pooled connection."""
         return load_family_members_from_db()
 
     async def populate_family_library(self, dry_run: bool = False) -> int:
@@ -324,7 +333,11 @@ class DatabasePopulator:
 
         try:
             url = get_family_game_list_url()
-            response = await self.client.get(url)
+            response = await self.make_request_with_retry(url, api_type="steam")
+            if response is None:
+                print("   ❌ Failed to fetch family shared library apps (no response)")
+                return 0
+
             games_json = self.handle_api_response("GetSharedLibraryApps", response)
 
             if not games_json:
@@ -356,15 +369,17 @@ class DatabasePopulator:
                     return None
                 # The appids_filter parameter is required by the steam library,
                 # even if we want all games. Passing an empty list should work.
+                # Only appids are used, so appinfo/extended appinfo are not
+                # requested; they would dominate the payload for big libraries.
                 return self.steam_api.call(
                     "IPlayerService.GetOwnedGames",
                     steamid=steam_id,
-                    include_appinfo=1,
+                    include_appinfo=0,
                     include_played_free_games=1,
                     appids_filter=[],
                     include_free_sub=1,
                     language="english",
-                    include_extended_appinfo=1,
+                    include_extended_appinfo=0,
                 )
             except (ValueError, TypeError, KeyError, OSError) as e:
                 logger.warning(
@@ -443,8 +458,6 @@ class DatabasePopulator:
         member_iterator_tqdm = tqdm(
             family_members.items(), desc="👥 Family Members", unit="member", leave=True
         )
-        progress_lock = asyncio.Lock()
-
         for steam_id, name in member_iterator_tqdm:
             member_iterator_tqdm.set_postfix_str(f"Processing {name}")
 
@@ -475,7 +488,6 @@ class DatabasePopulator:
                         name,
                         user_cached=user_cached,
                         user_skipped=user_skipped,
-                        progress_lock=progress_lock,
                     )
                 else:
                     self._show_empty_progress(name, user_cached, user_skipped)
@@ -533,9 +545,11 @@ class DatabasePopulator:
 
                 if games_to_fetch:
                     print(f"   🎯 Processing {len(games_to_fetch)} new games...")
-                    total_cached += await self._fetch_games_simple(
+                    fetched = await self._fetch_games_simple(
                         games_to_fetch, user_cached
                     )
+                    user_cached += fetched
+                    total_cached += fetched
 
                 print(
                     f"   ✅ {name} complete: {user_cached} cached, {user_skipped} skipped"
@@ -558,25 +572,52 @@ class DatabasePopulator:
     def _process_user_games(self, games, total_processed):
         """Process user games and return cached, skipped counts, games to fetch, and updated count."""
         user_cached = 0
-        user_skipped = 0
-        games_to_fetch = []
+        appids = [str(game.get("appid")) for game in games if game.get("appid")]
 
-        for game in games:
-            app_id = str(game.get("appid"))
-            if not app_id:
-                continue
+        # One batched existence check instead of a lookup per game
+        cached_appids = get_cached_appids(appids)
+        games_to_fetch = [app_id for app_id in appids if app_id not in cached_appids]
+        user_skipped = len(appids) - len(games_to_fetch)
+        total_processed += len(appids)
 
-            total_processed += 1
+        return user_cached, user_skipped, games_to_fetch, total_processed
 
-            if get_cached_game_details(app_id):
-                user_skipped += 1
-            else:
-                games_to_fetch.append(app_id)
+    async def _fetch_game_simple(self, app_id: str) -> Optional[tuple[str, dict]]:
+        """Fetch Store details for one game. Returns (app_id, game_data) or None on failure."""
+        game_url = f"{APPDETAILS_URL}{app_id}"
+        try:
+            game_response = await self.make_request_with_retry(
+                game_url, api_type="store"
+            )
+            if game_response is None:
+                return None
 
-        return user_cached, user_skipped, games_to_fetch, total_processed
+            game_info = self.handle_api_response(
+                f"AppDetails ({app_id})", game_response
+            )
+            if not game_info:
+                return None
+
+            game_data = game_info.get(str(app_id), {}).get("data")
+            if not game_data:
+                # Try fallback for games no longer on the Steam store
+                game_data = await self.get_fallback_game_info(app_id)
+            return (app_id, game_data)
+
+        except (
+            httpx.RequestError,
+            httpx.TimeoutException,
+            httpx.HTTPStatusError,
+            ValueError,
+            TypeError,
+            KeyError,
+            asyncio.TimeoutError,
+        ) as e:
+            logger.warning("Error processing game %s: %s", app_id, e)
+            return None
 
     async def _fetch_games_with_progress(
-        self, games_to_fetch, name, *, user_cached, user_skipped, progress_lock
+        self, games_to_fetch, name, *, user_cached, user_skipped
     ):
         """Fetch games with tqdm progress tracking."""
         games_progress_iterator_tqdm = tqdm(
@@ -584,87 +625,27 @@ class DatabasePopulator:
         )
         total_cached = 0
 
-        async def fetch_game_with_progress(app_id: str) -> Optional[tuple[str, dict]]:
-            nonlocal user_cached, user_skipped, total_cached
-            game_url = f"https://store.steampowered.com/api/appdetails?appids={app_id}&cc=us&l=en"
-            try:
-                game_response = await self.make_request_with_retry(
-                    game_url, api_type="store"
-                )
-                if game_response is None:
-                    async with progress_lock:
-                        user_skipped += 1
-                        games_progress_iterator_tqdm.update(1)
-                        games_progress_iterator_tqdm.set_postfix_str(
-                            f"Cached: {user_cached}, Skipped: {user_skipped} "
-                        )
-                    return None
-
-                game_info = self.handle_api_response(
-                    f"AppDetails ({app_id})", game_response
-                )
-                if not game_info:
-                    async with progress_lock:
-                        user_skipped += 1
-                        games_progress_iterator_tqdm.update(1)
-                        games_progress_iterator_tqdm.set_postfix_str(
-                            f"Cached: {user_cached}, Skipped: {user_skipped} "
-                        )
-                    return None
-
-                game_data = game_info.get(str(app_id), {}).get("data")
-                if not game_data:
-                    # Try fallback for games no longer on the Steam store
-                    fallback_data = await self.get_fallback_game_info(app_id)
-                    async with progress_lock:
-                        user_cached += 1
-                        total_cached += 1
-                        games_progress_iterator_tqdm.update(1)
-                        games_progress_iterator_tqdm.set_postfix_str(
-                            f"Cached: {user_cached}, Skipped: {user_skipped} "
-                        )
-                    return (app_id, fallback_data)
-
-                async with progress_lock:
-                    user_cached += 1
-                    total_cached += 1
-                    games_progress_iterator_tqdm.update(1)
-                    games_progress_iterator_tqdm.set_postfix_str(
-                        f"Cached: {user_cached}, Skipped: {user_skipped} "
-                    )
-                return (app_id, game_data)
-            except (
-                httpx.RequestError,
-                httpx.TimeoutException,
-                httpx.HTTPStatusError,
-                ValueError,
-                TypeError,
-                KeyError,
-                asyncio.TimeoutError,
-            ):
-                async with progress_lock:
-                    user_skipped += 1
-                    games_progress_iterator_tqdm.update(1)
-                    games_progress_iterator_tqdm.set_postfix_str(
-                        f"Cached: {user_cached}, Skipped: {user_skipped} "
-                    )
-                return None
-
         batch_size = 10
         for i in range(0, len(games_to_fetch), batch_size):
             batch = games_to_fetch[i : i + batch_size]
-            tasks = [fetch_game_with_progress(app_id) for app_id in batch]
+            tasks = [self._fetch_game_simple(app_id) for app_id in batch]
             results = await asyncio.gather(*tasks, return_exceptions=True)
 
             # Collect successful results
-            batch_data = {}
-            for res in results:
-                if isinstance(res, tuple):
-                    batch_data[res[0]] = res[1]
+            batch_data = dict(res for res in results if isinstance(res, tuple))
 
             # Write batch to DB
             self.batch_write_games(batch_data)
 
+            # Counters are only touched here, after the batch has settled
+            user_cached += len(batch_data)
+            user_skipped += len(batch) - len(batch_data)
+            total_cached += len(batch_data)
+            games_progress_iterator_tqdm.update(len(batch))
+            games_progress_iterator_tqdm.set_postfix_str(
+                f"Cached: {user_cached}, Skipped: {user_skipped} "
+            )
+
         games_progress_iterator_tqdm.close()
         return total_cached
 
@@ -681,65 +662,24 @@ class DatabasePopulator:
             games_progress_iterator_tqdm.close()
 
     async def _fetch_games_simple(self, games_to_fetch, user_cached):
-        """Fetch games without tqdm progress tracking."""
+        """Fetch games without tqdm progress tracking. Returns the number of games cached."""
         total_cached = 0
 
-        async def fetch_game_simple(app_id: str) -> bool:
-            """Fetch game details for non-tqdm mode."""
-            nonlocal user_cached, total_cached
-
-            game_url = f"https://store.steampowered.com/api/appdetails?appids={app_id}&cc=us&l=en"
-
-            try:
-                game_response = await self.make_request_with_retry(
-                    game_url, api_type="store"
-                )
-                if game_response is None:
-                    return False
-
-                game_info = self.handle_api_response(
-                    f"AppDetails ({app_id})", game_response
-                )
-                if not game_info:
-                    return False
-
-                game_data = game_info.get(str(app_id), {}).get("data")
-                if not game_data:
-                    # Try fallback for games no longer on the Steam store
-                    fallback_data = await self.get_fallback_game_info(app_id)
-                    cache_game_details(app_id, fallback_data, permanent=False)
-                    user_cached += 1
-                    total_cached += 1
-                    return True
-
-                cache_game_details(app_id, game_data, permanent=False)
-                user_cached += 1
-                total_cached += 1
-                return True
-
-            except (
-                httpx.RequestError,
-                httpx.TimeoutException,
-                httpx.HTTPStatusError,
-                ValueError,
-                TypeError,
-                KeyError,
-                asyncio.TimeoutError,
-            ) as e:
-                print(f"   ⚠️  Error processing game {app_id}: {e}")
-                return False
-
         # Process games in small batches with progress updates
         batch_size = 10
         for i in range(0, len(games_to_fetch), batch_size):
             batch = games_to_fetch[i : i + batch_size]
-            tasks = [fetch_game_simple(app_id) for app_id in batch]
-            await asyncio.gather(*tasks, return_exceptions=True)
+            tasks = [self._fetch_game_simple(app_id) for app_id in batch]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+            batch_data = dict(res for res in results if isinstance(res, tuple))
+            self.batch_write_games(batch_data)
+            total_cached += len(batch_data)
 
             # Progress update every batch
             processed = min(i + batch_size, len(games_to_fetch))
             print(
-                f"   📈 Progress: {processed}/{len(games_to_fetch)} | Cached: {user_cached} "
+                f"   📈 Progress: {processed}/{len(games_to_fetch)} | Cached: {user_cached + total_cached} "
             )
 
         return total_cached
@@ -901,7 +841,7 @@ class DatabasePopulator:
     async def _fetch_wishlist_item(self, app_id: str):
         """Fetch a single wishlist item's game details."""
         try:
-            game_url = f"https://store.steampowered.com/api/appdetails?appids={app_id}&cc=us&l=en"
+            game_url = f"{APPDETAILS_URL}{app_id}"
             response = await self.make_request_with_retry(game_url, api_type="store")
 
             if response:
@@ -932,7 +872,8 @@ class DatabasePopulator:
             print("❌ Steam API key not configured. Cannot fetch wishlists.")
             return 0
 
-        global_wishlist: list[list] = []
+        # app_id -> steam_ids wanting it; dict keeps aggregation O(1) per item
+        global_wishlist: dict[str, list[str]] = {}
         total_cached: int = 0
 
         # Collect wishlists from all family members
@@ -945,7 +886,7 @@ class DatabasePopulator:
                 if cached_wishlist:
                     print(f"   💾 Using cached wishlist ({len(cached_wishlist)} items)")
                     for app_id in cached_wishlist:
-                        add_to_wishlist(global_wishlist, str(app_id), steam_id)
+                        add_to_wishlist_index(global_wishlist, str(app_id), steam_id)
                     continue
 
                 if dry_run:
@@ -973,7 +914,7 @@ class DatabasePopulator:
                         continue
 
                     user_wishlist_appids.append(app_id)
-                    add_to_wishlist(global_wishlist, app_id, steam_id)
+                    add_to_wishlist_index(global_wishlist, app_id, steam_id)
 
                 # Cache the wishlist
                 cache_wishlist(steam_id, user_wishlist_appids)
@@ -992,9 +933,7 @@ class DatabasePopulator:
                 continue
 
         # Process ALL wishlist games (not just common ones)
-        all_unique_games = {
-            item[0] for item in global_wishlist
-        }  # Use set comprehension
+        all_unique_games = set(global_wishlist)
         if not all_unique_games:
             print("\n🎯 No wishlist games found")
             return 0
@@ -1006,10 +945,10 @@ class DatabasePopulator:
             return 0
 
         # Filter out games that are already cached
-        games_to_fetch = []
-        for app_id in all_unique_games:
-            if not get_cached_game_details(app_id):
-                games_to_fetch.append(app_id)
+        cached_appids = get_cached_appids(list(all_unique_games))
+        games_to_fetch = [
+            app_id for app_id in all_unique_games if app_id not in cached_appids
+        ]
 
         if not games_to_fetch:
             print("   ✅ All wishlist games already cached")
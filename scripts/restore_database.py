@@ -9,7 +9,9 @@ It should only be run when the bot is offline.
 import logging
 import os
 import shutil
+import sqlite3
 import sys
+from contextlib import closing
 from pathlib import Path
 
 # Add the src directory to the Python path
@@ -95,12 +97,25 @@ def restore_database():
         # 1. Backup the current (potentially corrupted) database as a safety measure
         if os.path.exists(DATABASE_FILE):
             safety_backup_path = f"{DATABASE_FILE}.before_restore"
-            shutil.copy2(DATABASE_FILE, safety_backup_path)
+            try:
+                # The backup API also captures pages still in the -wal file
+                with (
+                    closing(sqlite3.connect(DATABASE_FILE)) as source,
+                    closing(sqlite3.connect(safety_backup_path)) as dest,
+                ):
+                    source.backup(dest)
+            except sqlite3.Error:
+                # Too damaged for SQLite to read; keep the raw file instead
+                shutil.copy2(DATABASE_FILE, safety_backup_path)
             logger.info(
                 f"Safety backup of current database created at: {safety_backup_path}"
             )
 
-        # 2. Perform the restore
+        # 2. Perform the restore. Remove the old -wal/-shm sidecars first, or
+        # SQLite would replay the previous database's WAL over the restored file.
+        for sidecar in (f"{DATABASE_FILE}-wal", f"{DATABASE_FILE}-shm"):
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
         shutil.copy2(backup_to_restore, DATABASE_FILE)
         logger.info(
             f"✅ Database successfully restored from: {os.path.basename(backup_to_restore)}"
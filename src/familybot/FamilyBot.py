@@ -3,7 +3,9 @@
 # Import necessary libraries
 import argparse
 import asyncio
+import contextlib
 import os
+import signal
 import sys
 from datetime import datetime
 from typing import TYPE_CHECKING, cast
@@ -51,16 +53,26 @@ prefixed_commands.setup(cast(Client, client), default_prefix="!")
 # List to keep track of background tasks for graceful shutdown
 _running_tasks = []
 
+_HANDLED_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+# Whether _install_signal_handlers took over SIGINT/SIGTERM on the running loop
+_signal_handlers_installed = False
+# The running Web UI server, so a shutdown signal can let it exit gracefully
+_web_server: uvicorn.Server | None = None
+
 
 # --- Plugin Loading ---
 def get_plugins(directory: str) -> list:
-    plugin_list = []
+    # Plugins are drop-in .py files (see plugins/EXAMPLE_PLUGIN_README.md), so the
+    # list cannot be frozen at build time; a single scandir pass keeps this cheap.
     try:
-        for file_name in os.listdir(directory):
-            if file_name.endswith(".py") and not file_name.startswith("__"):
-                plugin_name = f"familybot.plugins.{file_name[:-3]}"
-                plugin_list.append(plugin_name)
-        return plugin_list
+        with os.scandir(directory) as entries:
+            return sorted(
+                f"familybot.plugins.{entry.name[:-3]}"
+                for entry in entries
+                if entry.name.endswith(".py")
+                and not entry.name.startswith("__")
+                and entry.is_file()
+            )
     except FileNotFoundError:
         logger.error("Plugin directory not found: %s", directory)
         return []
@@ -215,6 +227,20 @@ async def start_discord_bot():
     await client.astart()
 
 
+class _WebServer(uvicorn.Server):
+    """uvicorn Server that leaves SIGINT/SIGTERM to run_application when it owns them."""
+
+    @contextlib.contextmanager
+    def capture_signals(self):
+        # uvicorn would install its own handlers with signal.signal and re-raise
+        # the signal on exit, firing the loop handlers a second time mid-cleanup
+        if _signal_handlers_installed:
+            yield
+            return
+        with super().capture_signals():
+            yield
+
+
 async def start_web_server_main():
     """Starts the FastAPI web server using uvicorn Server."""
     # Set the bot client reference in the web API
@@ -229,13 +255,61 @@ async def start_web_server_main():
         port=WEB_UI_PORT,
         log_config=None,
         access_log=False,  # Disable access logs to reduce noise
+        # Live log frames are small JSON lines; deflate costs more than it saves.
+        # The stream is server-to-client only, so inbound frames can stay tiny.
+        ws_per_message_deflate=False,
+        ws_max_size=8192,
     )
-    server = uvicorn.Server(config)
+    global _web_server
+    server = _web_server = _WebServer(config)
     await server.serve()
 
 
+def _install_signal_handlers(shutdown_requested: asyncio.Event) -> None:
+    """Route SIGINT/SIGTERM straight into the event loop.
+
+    The handlers only set shutdown_requested; run_application then stops the
+    bot and web server itself, instead of relying on KeyboardInterrupt being
+    raised from whatever bytecode happens to be executing. Windows event loops
+    do not support add_signal_handler, so they keep the default behaviour.
+    """
+    global _signal_handlers_installed
+    loop = asyncio.get_running_loop()
+    for sig in _HANDLED_SIGNALS:
+        try:
+            loop.add_signal_handler(sig, shutdown_requested.set)
+        except (NotImplementedError, RuntimeError):
+            logger.debug("Signal handler for %s not supported on this platform", sig)
+        else:
+            _signal_handlers_installed = True
+
+
+def _remove_signal_handlers() -> None:
+    """Hand SIGINT/SIGTERM back to their defaults once shutdown has begun."""
+    global _signal_handlers_installed
+    if not _signal_handlers_installed:
+        return
+    loop = asyncio.get_running_loop()
+    for sig in _HANDLED_SIGNALS:
+        loop.remove_signal_handler(sig)
+    _signal_handlers_installed = False
+
+
+async def _stop_main_task(main_task: asyncio.Task) -> None:
+    """Stop the blocking bot or web server task after a shutdown signal."""
+    if _web_server is not None:
+        # Let uvicorn run its own graceful shutdown rather than cancelling serve()
+        _web_server.should_exit = True
+    else:
+        main_task.cancel()
+    await asyncio.gather(main_task, return_exceptions=True)
+
+
 async def run_application():
     """Runs the Discord bot and optionally the Web UI."""
+    shutdown_requested = asyncio.Event()
+    _install_signal_handlers(shutdown_requested)
+
     # Initialize the database
     try:
         await asyncio.to_thread(init_db)
@@ -264,20 +338,39 @@ async def run_application():
 
     try:
         if WEB_UI_ENABLED:
-            # If Web UI is enabled, uvicorn.run will be the blocking call.
+            # If Web UI is enabled, the uvicorn server will be the blocking call.
             # We start the Discord bot as a background task.
             discord_bot_task = asyncio.create_task(start_discord_bot())
             _running_tasks.append(discord_bot_task)
             logger.info("Discord bot task scheduled as background.")
 
             # Start the Web UI server (blocking call)
-            await start_web_server_main()  # This will block the event loop
+            main_task = asyncio.create_task(start_web_server_main())
         else:
             # If Web UI is not enabled, the Discord bot is the main blocking call.
-            await start_discord_bot()  # This will block the event loop
+            main_task = asyncio.create_task(start_discord_bot())
+        _running_tasks.append(main_task)
+
+        signal_waiter = asyncio.create_task(shutdown_requested.wait())
+        try:
+            await asyncio.wait(
+                (main_task, signal_waiter), return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            signal_waiter.cancel()
+
+        if shutdown_requested.is_set():
+            logger.info("Shutdown signal received, initiating graceful shutdown...")
+            # Removed first so a repeated signal can't interrupt the cleanup
+            _remove_signal_handlers()
+            await _stop_main_task(main_task)
+            await shutdown_application_tasks()
+            return
 
+        main_task.result()  # Surface errors from the bot or web server
         logger.info("Application tasks started.")
     except (KeyboardInterrupt, asyncio.CancelledError):
+        # Reached when no loop signal handlers could be installed (Windows)
         logger.info("Shutdown signal received, initiating graceful shutdown...")
         await shutdown_application_tasks()
     except Exception as e:
@@ -288,6 +381,7 @@ async def run_application():
 
 async def shutdown_application_tasks():
     """Unified graceful shutdown for all application tasks."""
+    _remove_signal_handlers()
     logger.info("Initiating graceful shutdown of all background tasks.")
     for task in _running_tasks:
         if not task.done():
@@ -331,13 +425,12 @@ def purge_game_cache() -> None:
     # Then use write connection only after user confirmation
     try:
         # Step 1: Query counts with a read connection (no write lock)
-        conn = get_db_connection()
+        cursor = get_db_connection().cursor()
         try:
-            cursor = conn.cursor()
             cursor.execute("SELECT COUNT(*) FROM game_details_cache")
             cache_count = cursor.fetchone()[0]
         finally:
-            conn.close()
+            cursor.close()
 
         if cache_count == 0:
             print("✅ Game details cache is already empty.")
@@ -384,15 +477,14 @@ def purge_wishlist_cache() -> None:
     # Then use write connection only after user confirmation
     try:
         # Step 1: Query counts with a read connection (no write lock)
-        conn = get_db_connection()
+        cursor = get_db_connection().cursor()
         try:
-            cursor = conn.cursor()
             cursor.execute("SELECT COUNT(DISTINCT steam_id) FROM wishlist_cache")
             user_count = cursor.fetchone()[0]
             cursor.execute("SELECT COUNT(*) FROM wishlist_cache")
             total_count = cursor.fetchone()[0]
         finally:
-            conn.close()
+            cursor.close()
 
         if total_count == 0:
             print("✅ Wishlist cache is already empty.")
@@ -442,13 +534,12 @@ def purge_family_library_cache_cli() -> None:
     # Then use write connection only after user confirmation
     try:
         # Step 1: Query counts with a read connection (no write lock)
-        conn = get_db_connection()
+        cursor = get_db_connection().cursor()
         try:
-            cursor = conn.cursor()
             cursor.execute("SELECT COUNT(*) FROM family_library_cache")
             cache_count = cursor.fetchone()[0]
         finally:
-            conn.close()
+            cursor.close()
 
         if cache_count == 0:
             print("✅ Family library cache is already empty.")
@@ -491,15 +582,14 @@ def purge_prices_cache() -> None:
     # Then use write connection only after user confirmation
     try:
         # Step 1: Query counts with a read connection (no write lock)
-        conn = get_db_connection()
+        cursor = get_db_connection().cursor()
         try:
-            cursor = conn.cursor()
             cursor.execute("SELECT COUNT(*) FROM itad_price_cache")
             price_count = cursor.fetchone()[0]
             cursor.execute("SELECT COUNT(*) FROM steam_itad_mapping")
             mapping_count = cursor.fetchone()[0]
         finally:
-            conn.close()
+            cursor.close()
 
         total_count = price_count + mapping_count
 
@@ -549,9 +639,8 @@ def purge_all_cache() -> None:
     # Then use write connection only after user confirmation
     try:
         # Step 1: Query counts with a read connection (no write lock)
-        conn = get_db_connection()
+        cursor = get_db_connection().cursor()
         try:
-            cursor = conn.cursor()
             cursor.execute("SELECT COUNT(*) FROM game_details_cache")
             game_count = cursor.fetchone()[0]
             cursor.execute("SELECT COUNT(*) FROM wishlist_cache")
@@ -563,7 +652,7 @@ def purge_all_cache() -> None:
             cursor.execute("SELECT COUNT(*) FROM itad_price_cache")
             itad_count = cursor.fetchone()[0]
         finally:
-            conn.close()
+            cursor.close()
 
         total_count = (
             game_count + wishlist_count + family_count + user_games_count + itad_count
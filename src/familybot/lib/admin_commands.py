@@ -1,16 +1,10 @@
 import asyncio
-import json
+import functools
 import logging
-import os
 import random
-import sys
 
 import httpx
-
-# Add the src directory to the Python path
-# This is usually handled by the main application's entry point,
-# but included here for potential standalone testing or clarity.
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+import orjson
 
 from familybot.config import STEAMWORKS_API_KEY
 from familybot.lib.family_library_repository import (
@@ -19,15 +13,15 @@ from familybot.lib.family_library_repository import (
 from familybot.lib.user_games_repository import cache_user_games
 from familybot.lib.wishlist_repository import cache_wishlist, get_cached_wishlist
 from familybot.lib.game_details_repository import (
-    cache_game_details,
-    get_cached_game_details,
+    cache_game_details_bulk,
+    get_cached_appids,
 )
 from familybot.lib.family_utils import get_family_game_list_url
 from familybot.lib.logging_config import setup_script_logging
-from familybot.lib.wishlist_service import add_to_wishlist
+from familybot.lib.wishlist_service import add_to_wishlist_index
 
 # TokenBucket will be imported from utils for now
-from familybot.lib.utils import TokenBucket
+from familybot.lib.utils import TokenBucket, parse_retry_after
 
 # Setup enhanced logging for this script
 logger = setup_script_logging("admin_commands", "INFO")
@@ -35,6 +29,16 @@ logger = setup_script_logging("admin_commands", "INFO")
 # Suppress verbose HTTP request logging from httpx
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
+# Steam endpoints used per member / per game; only the IDs vary between requests
+OWNED_GAMES_URL = "https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/"
+WISHLIST_URL = "https://api.steampowered.com/IWishlistService/GetWishlist/v1/"
+APPDETAILS_URL = "https://store.steampowered.com/api/appdetails?cc=us&l=en&appids="
+
+
+def _fetch_failed(task: asyncio.Task) -> bool:
+    """Whether a finished appdetails fetch produced nothing to cache."""
+    return task.done() and (task.cancelled() or task.result() is None)
+
 
 class DatabasePopulator:
     """Handles database population with token bucket rate limiting and async processing."""
@@ -59,7 +63,27 @@ class DatabasePopulator:
         self.max_retries = 3
         self.base_backoff = 1.0
 
-        self.client = httpx.AsyncClient(timeout=15.0)
+        # Members are processed concurrently; the token buckets still set the overall
+        # rate, these only cap how many requests each API host has in flight.
+        self.steam_sem = asyncio.Semaphore(8)
+        self.store_sem = asyncio.Semaphore(16)
+
+        # HTTP/2 lets the appdetails flood share a few multiplexed connections
+        self.client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(15.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=200,
+                max_keepalive_connections=50,
+                keepalive_expiry=60.0,
+            ),
+        )
+
+        # Store appdetails fetches in flight, keyed by app ID, and the app IDs
+        # fetched so far this run, so games shared across the family are only
+        # fetched once from the Store API
+        self._app_detail_fetches: dict[str, asyncio.Task] = {}
+        self._fetched_appids: set[str] = set()
 
         logger.info(f"Rate limiting mode: {rate_limit_mode}")
         logger.info(f"Steam API: {self.current_limits['steam_api']}s (token bucket)")
@@ -77,26 +101,29 @@ class DatabasePopulator:
     ) -> httpx.Response | None:
         """Make HTTP request with retry logic for 429 errors."""
         bucket = self.steam_bucket if api_type == "steam" else self.store_bucket
+        semaphore = self.steam_sem if api_type == "steam" else self.store_sem
 
         for attempt in range(self.max_retries + 1):
             try:
                 # Acquire token from bucket
                 await bucket.acquire()
 
-                # Add jitter to prevent synchronized requests on retries
-                if attempt > 0:
-                    jitter = random.uniform(0, 0.1)
-                    await asyncio.sleep(jitter)
-
                 # Make the request
-                response = await self.client.get(url, params=params)
+                async with semaphore:
+                    response = await self.client.get(url, params=params)
 
                 # Check for rate limiting
                 if response.status_code == 429:
+                    bucket.on_congestion()
                     if attempt < self.max_retries:
-                        backoff_time = self.base_backoff * (
-                            2**attempt
-                        ) + random.uniform(0, 1)
+                        # Prefer the server's Retry-After, else full-jitter backoff
+                        backoff_time = parse_retry_after(
+                            response.headers.get("Retry-After")
+                        )
+                        if backoff_time is None:
+                            backoff_time = random.uniform(
+                                0, self.base_backoff * (2**attempt)
+                            )
                         logger.warning(
                             f"Rate limited (429), retrying in {backoff_time:.1f}s (attempt {attempt + 1}/{self.max_retries + 1})"
                         )
@@ -106,11 +133,12 @@ class DatabasePopulator:
                         logger.error(f"Max retries exceeded for {url}")
                         return None
 
+                bucket.on_success()
                 return response
 
             except Exception as e:
                 if attempt < self.max_retries:
-                    backoff_time = self.base_backoff * (2**attempt)
+                    backoff_time = random.uniform(0, self.base_backoff * (2**attempt))
                     logger.warning(
                         f"Request failed: {e}, retrying in {backoff_time:.1f}s"
                     )
@@ -130,7 +158,7 @@ class DatabasePopulator:
         """Handle API responses with error checking and enhanced logging."""
         try:
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 429:
                 logger.warning(f"Rate limited for {api_name}")
@@ -140,13 +168,58 @@ class DatabasePopulator:
         except httpx.RequestError as e:
             logger.error(f"Request error for {api_name}: {e}")
             return None
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"JSON decode error for {api_name}: {e}")
             return None
         except Exception as e:
             logger.error(f"Unexpected error for {api_name}: {e}")
             return None
 
+    async def _fetch_app_details(self, app_id: str) -> tuple[str, dict] | None:
+        """Fetch Store appdetails for one game, returning (app_id, game_data) to cache.
+
+        Returns None on failure, or if another member's task already fetched this
+        app ID during the current run (that task caches it). A caller that finds
+        the fetch in flight waits for it and retries itself if it failed.
+        """
+        pending = self._app_detail_fetches.get(app_id)
+        while pending is not None and not pending.done():
+            if await asyncio.shield(pending) is not None:
+                return None
+            pending = self._app_detail_fetches.get(app_id)
+        if app_id in self._fetched_appids:
+            return None
+
+        task = asyncio.create_task(self._request_app_details(app_id))
+        self._app_detail_fetches[app_id] = task
+        task.add_done_callback(functools.partial(self._finish_app_fetch, app_id))
+        # Shielded so cancelling this caller doesn't fail the fetch for the others
+        return await asyncio.shield(task)
+
+    def _finish_app_fetch(self, app_id: str, task: asyncio.Task) -> None:
+        """Drop a finished fetch so its payload isn't kept for the rest of the run."""
+        if self._app_detail_fetches.get(app_id) is task:
+            del self._app_detail_fetches[app_id]
+        if not _fetch_failed(task):
+            self._fetched_appids.add(app_id)
+
+    async def _request_app_details(self, app_id: str) -> tuple[str, dict] | None:
+        """Request appdetails for one game from the Store API."""
+        try:
+            game_response = await self.make_request_with_retry(
+                f"{APPDETAILS_URL}{app_id}", api_type="store"
+            )
+            if game_response is not None:
+                game_info = self.handle_api_response(
+                    f"AppDetails ({app_id})", game_response
+                )
+                game_data = (game_info or {}).get(str(app_id), {}).get("data")
+                if game_data:
+                    return app_id, game_data
+        except Exception as e:
+            logger.warning(f"Error processing game {app_id}: {e}")
+        return None
+
     async def populate_family_library(self, dry_run: bool = False) -> int:
         """Populate the shared family library cache."""
         logger.info("Starting family shared library population...")
@@ -176,7 +249,7 @@ class DatabasePopulator:
                 return 0
 
             # Cache the library using our new 24h default
-            cache_family_library(game_list)
+            await asyncio.to_thread(cache_family_library, game_list)
             logger.info(f"Cached {len(game_list)} family library apps")
             return len(game_list)
 
@@ -197,131 +270,105 @@ class DatabasePopulator:
             logger.error("Steam API key not configured. Cannot fetch family libraries.")
             return 0
 
-        total_cached = 0
-        total_processed = 0
-
-        for steam_id, name in family_members.items():
-            logger.info(f"Processing {name}'s library...")
-
-            try:
-                owned_games_url = (
-                    "https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/"
-                )
-                owned_games_params = {
-                    "key": STEAMWORKS_API_KEY,
-                    "steamid": steam_id,
-                    "include_appinfo": 1,
-                    "include_played_free_games": 1,
-                }
-
-                if dry_run:
-                    logger.info(f"Would fetch owned games for {name}")
-                    continue
-
-                response = await self.make_request_with_retry(
-                    owned_games_url, api_type="steam", params=owned_games_params
-                )
-                if response is None:
-                    logger.warning(f"Failed to get games for {name}")
-                    continue
-
-                games_data = self.handle_api_response(
-                    f"GetOwnedGames ({name})", response
-                )
-
-                if not games_data:
-                    logger.warning(f"Failed to get games for {name}")
-                    continue
-
-                games = games_data.get("response", {}).get("games", [])
-                if not games:
-                    logger.info(f"No games found for {name} (private profile?)")
-                    continue
-
-                logger.info(f"Found {len(games)} games for {name}")
-
-                # Cache the user's game list for !common_games support
-                user_appids = [str(g.get("appid")) for g in games if g.get("appid")]
-                if user_appids:
-                    cache_user_games(steam_id, user_appids)
+        results = await asyncio.gather(
+            *(
+                self._process_member_library(steam_id, name, dry_run)
+                for steam_id, name in family_members.items()
+            )
+        )
+        total_cached = sum(cached for cached, _ in results)
+        total_processed = sum(processed for _, processed in results)
 
-                user_cached = 0
-                user_skipped = 0
+        logger.info(
+            f"Family library population complete! Total games processed: {total_processed}, New games cached: {total_cached}"
+        )
 
-                games_to_fetch = []
-                for game in games:
-                    app_id = str(game.get("appid"))
-                    if not app_id:
-                        continue
+        return total_cached
 
-                    total_processed += 1
+    async def _process_member_library(
+        self, steam_id: str, name: str, dry_run: bool
+    ) -> tuple[int, int]:
+        """Fetch and cache one member's library. Returns (games cached, games processed)."""
+        logger.info(f"Processing {name}'s library...")
 
-                    if get_cached_game_details(app_id):
-                        user_skipped += 1
-                    else:
-                        games_to_fetch.append(app_id)
+        user_cached = 0
+        total_processed = 0
 
-                if games_to_fetch:
-                    logger.info(
-                        f"Processing {len(games_to_fetch)} new games for {name}..."
+        try:
+            # Only appids are used, so skip include_appinfo: names, icons and
+            # the other per-game fields would dominate the payload for big libraries
+            owned_games_params = {
+                "key": STEAMWORKS_API_KEY,
+                "steamid": steam_id,
+                "include_played_free_games": 1,
+            }
+
+            if dry_run:
+                logger.info(f"Would fetch owned games for {name}")
+                return 0, 0
+
+            response = await self.make_request_with_retry(
+                OWNED_GAMES_URL, api_type="steam", params=owned_games_params
+            )
+            if response is None:
+                logger.warning(f"Failed to get games for {name}")
+                return 0, 0
+
+            games_data = self.handle_api_response(f"GetOwnedGames ({name})", response)
+
+            if not games_data:
+                logger.warning(f"Failed to get games for {name}")
+                return 0, 0
+
+            games = games_data.get("response", {}).get("games", [])
+            if not games:
+                logger.info(f"No games found for {name} (private profile?)")
+                return 0, 0
+
+            logger.info(f"Found {len(games)} games for {name}")
+
+            # Cache the user's game list for !common_games support
+            user_appids = [str(g.get("appid")) for g in games if g.get("appid")]
+            if user_appids:
+                await asyncio.to_thread(cache_user_games, steam_id, user_appids)
+
+            # One batched existence check instead of a lookup per game. DB calls
+            # run in a worker thread so the event loop keeps servicing requests.
+            cached_appids = await asyncio.to_thread(get_cached_appids, user_appids)
+            games_to_fetch = [
+                app_id for app_id in user_appids if app_id not in cached_appids
+            ]
+            user_skipped = len(user_appids) - len(games_to_fetch)
+            total_processed += len(user_appids)
+
+            if games_to_fetch:
+                logger.info(f"Processing {len(games_to_fetch)} new games for {name}...")
+
+                batch_size = 5
+                for i in range(0, len(games_to_fetch), batch_size):
+                    batch = games_to_fetch[i : i + batch_size]
+                    tasks = [self._fetch_app_details(app_id) for app_id in batch]
+                    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+                    # Write the whole batch in one transaction
+                    batch_games = [res for res in results if isinstance(res, tuple)]
+                    user_cached += await asyncio.to_thread(
+                        cache_game_details_bulk, batch_games, permanent=False
                     )
 
-                    async def fetch_game_simple(app_id: str) -> bool:
-                        nonlocal user_cached, total_cached
-
-                        game_url = f"https://store.steampowered.com/api/appdetails?appids={app_id}&cc=us&l=en"
-
-                        try:
-                            game_response = await self.make_request_with_retry(
-                                game_url, api_type="store"
-                            )
-                            if game_response is None:
-                                return False
-
-                            game_info = self.handle_api_response(
-                                f"AppDetails ({app_id})", game_response
-                            )
-
-                            if not game_info:
-                                return False
-
-                            game_data = game_info.get(str(app_id), {}).get("data")
-                            if not game_data:
-                                return False
-
-                            cache_game_details(app_id, game_data, permanent=False)
-                            user_cached += 1
-                            total_cached += 1
-                            return True
-
-                        except Exception as e:
-                            logger.warning(f"Error processing game {app_id}: {e}")
-                            return False
-
-                    batch_size = 5
-                    for i in range(0, len(games_to_fetch), batch_size):
-                        batch = games_to_fetch[i : i + batch_size]
-                        tasks = [fetch_game_simple(app_id) for app_id in batch]
-                        await asyncio.gather(*tasks, return_exceptions=True)
-
-                        processed = min(i + batch_size, len(games_to_fetch))
-                        logger.debug(
-                            f"Progress for {name}: {processed}/{len(games_to_fetch)} | Cached: {user_cached}"
-                        )
-
-                logger.info(
-                    f"{name}'s library complete: {user_cached} cached, {user_skipped} skipped"
-                )
+                    processed = min(i + batch_size, len(games_to_fetch))
+                    logger.debug(
+                        f"Progress for {name}: {processed}/{len(games_to_fetch)} | Cached: {user_cached}"
+                    )
 
-            except Exception as e:
-                logger.error(f"Error processing {name}'s library: {e}")
-                continue
+            logger.info(
+                f"{name}'s library complete: {user_cached} cached, {user_skipped} skipped"
+            )
 
-        logger.info(
-            f"Family library population complete! Total games processed: {total_processed}, New games cached: {total_cached}"
-        )
+        except Exception as e:
+            logger.error(f"Error processing {name}'s library: {e}")
 
-        return total_cached
+        return user_cached, total_processed
 
     async def populate_wishlists(
         self, family_members: dict[str, str], dry_run: bool = False
@@ -336,76 +383,25 @@ class DatabasePopulator:
             logger.error("Steam API key not configured. Cannot fetch wishlists.")
             return 0
 
-        global_wishlist: list[list] = []
+        # app_id -> steam_ids wanting it; dict keeps aggregation O(1) per item
+        global_wishlist: dict[str, list[str]] = {}
         total_cached = 0
 
-        for i, (steam_id, name) in enumerate(family_members.items(), 1):
-            logger.info(f"Processing {name}'s wishlist ({i}/{len(family_members)})...")
-
-            try:
-                cached_wishlist = get_cached_wishlist(steam_id)
-                if cached_wishlist:
-                    logger.info(
-                        f"Using cached wishlist for {name} ({len(cached_wishlist)} items)"
-                    )
-                    for app_id in cached_wishlist:
-                        add_to_wishlist(global_wishlist, str(app_id), steam_id)
-                    continue
-
-                if dry_run:
-                    logger.info(f"Would fetch wishlist for {name}")
-                    continue
-
-                wishlist_url = (
-                    "https://api.steampowered.com/IWishlistService/GetWishlist/v1/"
+        member_count = len(family_members)
+        await asyncio.gather(
+            *(
+                self._process_member_wishlist(
+                    steam_id, name, global_wishlist, dry_run, position, member_count
                 )
-                wishlist_params = {
-                    "key": STEAMWORKS_API_KEY,
-                    "steamid": steam_id,
-                }
-
-                response = await self.make_request_with_retry(
-                    wishlist_url, api_type="steam", params=wishlist_params
-                )
-                if response is None:
-                    logger.warning(f"Failed to get wishlist for {name}")
-                    continue
-
-                if response.text == '{"success":2}':
-                    logger.info(f"{name}'s wishlist is private or empty")
-                    continue
-
-                wishlist_data = self.handle_api_response(
-                    f"GetWishlist ({name})", response
-                )
-                if not wishlist_data:
-                    continue
-
-                wishlist_items = wishlist_data.get("response", {}).get("items", [])
-                if not wishlist_items:
-                    logger.info(f"No items in {name}'s wishlist")
-                    continue
-
-                logger.info(f"Found {len(wishlist_items)} wishlist items for {name}")
-
-                user_wishlist_appids = []
-                for item in wishlist_items:
-                    app_id = str(item.get("appid"))
-                    if not app_id:
-                        continue
-
-                    user_wishlist_appids.append(app_id)
-                    add_to_wishlist(global_wishlist, app_id, steam_id)
-
-                # Cache the wishlist
-                cache_wishlist(steam_id, user_wishlist_appids)
-                logger.info(f"{name}'s wishlist cached")
-
-            except Exception as e:
-                logger.error(f"Error processing {name}'s wishlist: {e}")
-                continue
+                for position, (steam_id, name) in enumerate(family_members.items(), 1)
+            )
+        )
 
-        common_games = [item for item in global_wishlist if len(item[1]) > 1]
+        common_games = [
+            (app_id, steam_ids)
+            for app_id, steam_ids in global_wishlist.items()
+            if len(steam_ids) > 1
+        ]
         if not common_games:
             logger.info("No common wishlist games found")
             return 0
@@ -416,44 +412,99 @@ class DatabasePopulator:
             logger.info("Would process common wishlist games for caching")
             return 0
 
-        for i, item in enumerate(common_games):
-            app_id = item[0]
+        cached_appids = await asyncio.to_thread(
+            get_cached_appids, [app_id for app_id, _ in common_games]
+        )
+        games_to_fetch = [
+            app_id for app_id, _ in common_games if app_id not in cached_appids
+        ]
 
-            if get_cached_game_details(app_id):
-                continue
+        batch_size = 10
+        for i in range(0, len(games_to_fetch), batch_size):
+            batch = games_to_fetch[i : i + batch_size]
+            tasks = [self._fetch_app_details(app_id) for app_id in batch]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
 
-            try:
-                game_url = f"https://store.steampowered.com/api/appdetails?appids={app_id}&cc=us&l=en"
+            # Write the whole batch in one transaction
+            batch_games = [res for res in results if isinstance(res, tuple)]
+            total_cached += await asyncio.to_thread(
+                cache_game_details_bulk, batch_games, permanent=False
+            )
 
-                response = await self.make_request_with_retry(
-                    game_url, api_type="store"
+            processed = min(i + batch_size, len(games_to_fetch))
+            logger.debug(f"Progress: {processed}/{len(games_to_fetch)} games processed")
+
+        logger.info(
+            f"Wishlist population complete! Common games cached: {total_cached}"
+        )
+
+        return total_cached
+
+    async def _process_member_wishlist(
+        self,
+        steam_id: str,
+        name: str,
+        global_wishlist: dict[str, list[str]],
+        dry_run: bool,
+        position: int,
+        member_count: int,
+    ) -> None:
+        """Fetch and cache one member's wishlist, merging it into global_wishlist."""
+        logger.info(f"Processing {name}'s wishlist ({position}/{member_count})...")
+
+        try:
+            cached_wishlist = await asyncio.to_thread(get_cached_wishlist, steam_id)
+            if cached_wishlist:
+                logger.info(
+                    f"Using cached wishlist for {name} ({len(cached_wishlist)} items)"
                 )
-                if response is None:
-                    continue
+                for app_id in cached_wishlist:
+                    add_to_wishlist_index(global_wishlist, str(app_id), steam_id)
+                return
+
+            if dry_run:
+                logger.info(f"Would fetch wishlist for {name}")
+                return
+
+            wishlist_params = {
+                "key": STEAMWORKS_API_KEY,
+                "steamid": steam_id,
+            }
+
+            response = await self.make_request_with_retry(
+                WISHLIST_URL, api_type="steam", params=wishlist_params
+            )
+            if response is None:
+                logger.warning(f"Failed to get wishlist for {name}")
+                return
 
-                game_info = self.handle_api_response(f"AppDetails ({app_id})", response)
+            if response.text == '{"success":2}':
+                logger.info(f"{name}'s wishlist is private or empty")
+                return
 
-                if not game_info:
-                    continue
+            wishlist_data = self.handle_api_response(f"GetWishlist ({name})", response)
+            if not wishlist_data:
+                return
 
-                game_data = game_info.get(str(app_id), {}).get("data")
-                if not game_data:
-                    continue
+            wishlist_items = wishlist_data.get("response", {}).get("items", [])
+            if not wishlist_items:
+                logger.info(f"No items in {name}'s wishlist")
+                return
 
-                cache_game_details(app_id, game_data, permanent=False)
-                total_cached += 1
+            logger.info(f"Found {len(wishlist_items)} wishlist items for {name}")
 
-                if (i + 1) % 10 == 0:
-                    logger.debug(
-                        f"Progress: {i + 1}/{len(common_games)} games processed"
-                    )
+            user_wishlist_appids = []
+            for item in wishlist_items:
+                app_id = str(item.get("appid"))
+                if not app_id:
+                    continue
 
-            except Exception as e:
-                logger.warning(f"Error processing game {app_id}: {e}")
-                continue
+                user_wishlist_appids.append(app_id)
+                add_to_wishlist_index(global_wishlist, app_id, steam_id)
 
-        logger.info(
-            f"Wishlist population complete! Common games cached: {total_cached}"
-        )
+            # Cache the wishlist
+            await asyncio.to_thread(cache_wishlist, steam_id, user_wishlist_appids)
+            logger.info(f"{name}'s wishlist cached")
 
-        return total_cached
+        except Exception as e:
+            logger.error(f"Error processing {name}'s wishlist: {e}")
@@ -1,7 +1,7 @@
 """API utility functions for Steam and other external services."""
 
-import json
 import aiohttp
+import orjson
 
 from familybot.lib.logging_config import get_logger
 
@@ -22,7 +22,7 @@ async def handle_api_response(
     """
     try:
         response.raise_for_status()
-        body = await response.text()
+        body = await response.read()
     except aiohttp.ClientResponseError as e:
         logger.error(f"Request error for {api_name}: {e}. URL: {e.request_info.url}")
         return None
@@ -37,8 +37,10 @@ async def handle_api_response(
         return None
 
     try:
-        json_data = json.loads(body)
+        json_data = orjson.loads(body)
         return json_data
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON decode error for {api_name}: {e}. Raw: {body[:200]}")
+    except orjson.JSONDecodeError as e:
+        logger.error(
+            f"JSON decode error for {api_name}: {e}. Raw: {body[:200].decode(errors='replace')}"
+        )
         return None
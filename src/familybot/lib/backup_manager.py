@@ -1,5 +1,6 @@
 import os
-import shutil
+import sqlite3
+from contextlib import closing, suppress
 from datetime import datetime
 
 from familybot.config import PROJECT_ROOT
@@ -14,23 +15,26 @@ BACKUP_DIR = os.path.join(PROJECT_ROOT, "backups")
 def cleanup_old_backups(keep_count=10):
     """Keeps only the N most recent backups."""
     try:
-        files = []
         if not os.path.exists(BACKUP_DIR):
             return
 
-        for f in os.listdir(BACKUP_DIR):
-            if f.startswith("bot_data_") and f.endswith(".db"):
-                full_path = os.path.join(BACKUP_DIR, f)
-                files.append(full_path)
+        # Collect (mtime, path) pairs in one scandir pass so each file is
+        # stat'ed once, instead of on every sort comparison
+        with os.scandir(BACKUP_DIR) as entries:
+            files = [
+                (entry.stat().st_mtime, entry.path)
+                for entry in entries
+                if entry.is_file()
+                and entry.name.startswith("bot_data_")
+                and entry.name.endswith(".db")
+            ]
 
         # Sort by modification time (newest first)
-        files.sort(key=os.path.getmtime, reverse=True)
+        files.sort(reverse=True)
 
-        if len(files) > keep_count:
-            files_to_delete = files[keep_count:]
-            for f in files_to_delete:
-                os.remove(f)
-                logger.info(f"🗑️ Removed old backup: {os.path.basename(f)}")
+        for _, path in files[keep_count:]:
+            os.remove(path)
+            logger.info(f"🗑️ Removed old backup: {os.path.basename(path)}")
 
     except Exception as e:
         logger.warning(f"Error cleaning up old backups: {e}")
@@ -55,14 +59,23 @@ def backup_database() -> bool:
     backup_path = os.path.join(BACKUP_DIR, backup_filename)
 
     try:
-        # Perform the copy
-        shutil.copy2(DATABASE_FILE, backup_path)
+        # Use SQLite's online backup API rather than copying the file: the
+        # database runs in WAL mode, so a raw copy of bot_data.db can miss
+        # committed pages still in the -wal file while the bot is live.
+        with (
+            closing(sqlite3.connect(DATABASE_FILE)) as source,
+            closing(sqlite3.connect(backup_path)) as dest,
+        ):
+            source.backup(dest)
         logger.info(f"✅ Database backed up successfully to: {backup_path}")
 
         # Clean up old backups
         cleanup_old_backups()
 
         return True
-    except IOError as e:
+    except (sqlite3.Error, OSError) as e:
         logger.error(f"❌ Failed to backup database: {e}")
+        # A partial file would otherwise count as a valid backup during cleanup
+        with suppress(OSError):
+            os.remove(backup_path)
         return False
@@ -1,11 +1,13 @@
 # In src/familybot/lib/database.py
 
+import atexit
 import contextlib
 import logging
 import os
 import sqlite3
 import threading
 from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 
 from familybot.config import PROJECT_ROOT
 
@@ -20,23 +22,56 @@ DATABASE_FILE = os.path.join(PROJECT_ROOT, "bot_data.db")
 # --- Connection pool: single connection per thread with write serialization ---
 _local = threading.local()
 _write_lock = threading.Lock()
+# Every pooled connection, so the ones owned by worker threads get closed at exit
+_all_conns: set[sqlite3.Connection] = set()
+_all_conns_lock = threading.Lock()
+
+# journal_mode=WAL is persisted in the database file, so it only needs to be
+# set (and verified) by the first connection of the process. In-memory
+# databases cannot use WAL, so they skip it.
+_wal_enabled = False
+
+# Per-connection settings, re-applied to every new pooled connection
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",  # WAL stays consistent without an fsync per commit
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MiB of the file read via mmap
+)
 
 
 def _create_conn():
     """Create a new SQLite connection with standard settings."""
+    global _wal_enabled
     try:
-        conn = sqlite3.connect(DATABASE_FILE, check_same_thread=False)
+        # Implicit transactions (opened before INSERT/UPDATE/DELETE) take the
+        # write lock up front, so another process writing at the same time
+        # waits on busy_timeout instead of failing a later lock upgrade.
+        # The statement cache is doubled because chunked IN (...) queries
+        # produce a distinct SQL string per chunk length.
+        conn = sqlite3.connect(
+            DATABASE_FILE,
+            check_same_thread=False,
+            isolation_level="IMMEDIATE",
+            cached_statements=256,
+        )
         conn.row_factory = sqlite3.Row
-        result = conn.execute("PRAGMA journal_mode=WAL").fetchone()
-        if not result or result[0].lower() != "wal":
-            result_val = result[0] if result else None
-            logger.critical(
-                "Failed to set WAL mode: PRAGMA journal_mode=WAL returned %r",
-                result_val,
-            )
-            raise RuntimeError(
-                f"Database WAL mode not enabled: PRAGMA returned {result_val!r}"
-            )
+        if not _wal_enabled and DATABASE_FILE != ":memory:":
+            result = conn.execute("PRAGMA journal_mode=WAL").fetchone()
+            if not result or result[0].lower() != "wal":
+                result_val = result[0] if result else None
+                logger.critical(
+                    "Failed to set WAL mode: PRAGMA journal_mode=WAL returned %r",
+                    result_val,
+                )
+                raise RuntimeError(
+                    f"Database WAL mode not enabled: PRAGMA returned {result_val!r}"
+                )
+            _wal_enabled = True
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        with _all_conns_lock:
+            _all_conns.add(conn)
         return conn
     except sqlite3.Error as e:
         logger.critical(f"Database connection error: {e}")
@@ -48,17 +83,12 @@ def get_db_connection():
 
     Uses a single connection per thread to avoid repeated setup overhead.
     Writes are serialized via _write_lock to prevent concurrent write corruption.
+    Callers must not close the returned connection; use close_db_connection().
     """
-    if not hasattr(_local, "conn") or _local.conn is None:
-        _local.conn = _create_conn()
-    else:
-        # Check if the existing connection is still usable (not closed)
-        try:
-            _local.conn.execute("SELECT 1")
-        except sqlite3.ProgrammingError:
-            # Connection was closed, create a new one
-            _local.conn = _create_conn()
-    return _local.conn
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = _create_conn()
+    return conn
 
 
 @contextmanager
@@ -72,8 +102,9 @@ def get_write_connection():
             conn.commit()
 
     If an exception is raised inside the with-block, the transaction is
-    automatically rolled back to prevent leaving an open transaction on
-    the reused thread-local connection.
+    automatically rolled back; otherwise anything still uncommitted is
+    committed on exit. Either way no transaction is left open on the reused
+    thread-local connection (or holding the database write lock).
     """
     conn = get_db_connection()
     with _write_lock:
@@ -82,16 +113,50 @@ def get_write_connection():
         except BaseException:
             conn.rollback()
             raise
+        if conn.in_transaction:
+            conn.commit()
 
 
 def close_db_connection():
     """Close the thread-local database connection if it exists."""
     if hasattr(_local, "conn") and _local.conn is not None:
+        with _all_conns_lock:
+            _all_conns.discard(_local.conn)
         with contextlib.suppress(sqlite3.Error):
             _local.conn.close()
         _local.conn = None
 
 
+@atexit.register
+def _close_all_connections():
+    """Close every pooled connection at interpreter exit, whichever thread owns it."""
+    with _all_conns_lock:
+        conns = list(_all_conns)
+        _all_conns.clear()
+    for conn in conns:
+        with contextlib.suppress(sqlite3.Error):
+            # Refresh planner statistics for the tables this connection used
+            conn.execute("PRAGMA optimize")
+    if conns:
+        with contextlib.suppress(sqlite3.Error):
+            # Fold the WAL back into the database and truncate it, so it does
+            # not stay large if another process keeps the database open
+            conns[0].execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    for conn in conns:
+        with contextlib.suppress(sqlite3.Error):
+            conn.close()
+
+
+# Small-row tables that are only ever looked up by their primary key. Storing
+# them clustered on that key skips the extra rowid B-tree hop per lookup.
+# Maps table name -> primary key column.
+_WITHOUT_ROWID_TABLES = {
+    "saved_games": "appid",
+    "discord_users_cache": "discord_id",
+    "family_library_cache": "appid",
+}
+
+
 def _create_tables(cursor: sqlite3.Cursor):
     """Creates all necessary database tables if they do not already exist."""
     cursor.execute("""
@@ -106,7 +171,7 @@ def _create_tables(cursor: sqlite3.Cursor):
         CREATE TABLE IF NOT EXISTS saved_games (
             appid TEXT PRIMARY KEY,
             detected_at TEXT NOT NULL DEFAULT (STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW'))
-        )
+        ) WITHOUT ROWID
     """)
     logger.info("Database: 'saved_games' table checked/created.")
 
@@ -147,7 +212,16 @@ def _create_tables(cursor: sqlite3.Cursor):
             PRIMARY KEY (steam_id, appid)
         )
     """)
-    logger.info("Database: 'user_games_cache' table checked/created.")
+    # Add index for expiry filters and cleanup_expired_cache range deletes
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_user_games_cache_expires_at ON user_games_cache(expires_at)
+    """)
+    # Covering index so per-user cache lookups never touch the table rows
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_user_games_cache_steam_id_expires_at
+        ON user_games_cache(steam_id, expires_at, appid)
+    """)
+    logger.info("Database: 'user_games_cache' table checked/created and indexed.")
 
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS wishlist_cache (
@@ -158,7 +232,16 @@ def _create_tables(cursor: sqlite3.Cursor):
             PRIMARY KEY (steam_id, appid)
         )
     """)
-    logger.info("Database: 'wishlist_cache' table checked/created.")
+    # Add index for expiry filters and cleanup_expired_cache range deletes
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_wishlist_cache_expires_at ON wishlist_cache(expires_at)
+    """)
+    # Covering index so per-user cache lookups never touch the table rows
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_wishlist_cache_steam_id_expires_at
+        ON wishlist_cache(steam_id, expires_at, appid)
+    """)
+    logger.info("Database: 'wishlist_cache' table checked/created and indexed.")
 
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS discord_users_cache (
@@ -166,9 +249,13 @@ def _create_tables(cursor: sqlite3.Cursor):
             username TEXT,
             cached_at TEXT NOT NULL,
             expires_at TEXT NOT NULL
-        )
+        ) WITHOUT ROWID
+    """)
+    # Add index for expiry filters and cleanup_expired_cache range deletes
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_discord_users_cache_expires_at ON discord_users_cache(expires_at)
     """)
-    logger.info("Database: 'discord_users_cache' table checked/created.")
+    logger.info("Database: 'discord_users_cache' table checked/created and indexed.")
 
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS family_library_cache (
@@ -177,9 +264,13 @@ def _create_tables(cursor: sqlite3.Cursor):
             exclude_reason INTEGER,
             cached_at TEXT NOT NULL,
             expires_at TEXT NOT NULL
-        )
+        ) WITHOUT ROWID
+    """)
+    # Add index for expiry filters and cleanup_expired_cache range deletes
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_family_library_cache_expires_at ON family_library_cache(expires_at)
     """)
-    logger.info("Database: 'family_library_cache' table checked/created.")
+    logger.info("Database: 'family_library_cache' table checked/created and indexed.")
 
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS itad_price_cache (
@@ -223,10 +314,45 @@ def _create_tables(cursor: sqlite3.Cursor):
     logger.info("Database: 'migrations' table checked/created.")
 
 
+def _rebuild_without_rowid_tables(cursor: sqlite3.Cursor):
+    """Rebuilds existing rowid copies of _WITHOUT_ROWID_TABLES as WITHOUT ROWID.
+
+    Must run before _create_tables, which recreates the indexes dropped along
+    with the old tables.
+    """
+    placeholders = ", ".join("?" * len(_WITHOUT_ROWID_TABLES))
+    cursor.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name IN ({placeholders})",
+        tuple(_WITHOUT_ROWID_TABLES),
+    )
+    for table, sql in cursor.fetchall():
+        if "WITHOUT ROWID" in sql.upper():
+            continue
+
+        logger.info(f"Database: Rebuilding '{table}' as a WITHOUT ROWID table.")
+        key = _WITHOUT_ROWID_TABLES[table]
+        # sqlite_master keeps the DDL current with any ADD COLUMN migrations, so
+        # the rebuilt table has exactly the existing columns in the same order
+        new_sql = sql.replace(table, f"{table}_new", 1).rstrip() + " WITHOUT ROWID"
+        cursor.execute(new_sql)
+        # WITHOUT ROWID enforces NOT NULL on the key, which rowid tables did not
+        cursor.execute(
+            f"INSERT INTO {table}_new SELECT * FROM {table} WHERE {key} IS NOT NULL"
+        )
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+
+def _table_columns(cursor: sqlite3.Cursor, table: str) -> set[str]:
+    """Return the set of column names defined on a table."""
+    return {col[1] for col in cursor.execute(f"PRAGMA table_info({table})")}
+
+
 def _run_column_migrations(cursor: sqlite3.Cursor):
     """Applies declarative column migrations to existing tables."""
     # List of (table_name, column_name, column_definition, default_value_for_update)
     # default_value_for_update is used to populate existing rows if not NULL.
+    # Append-only: PRAGMA user_version records how many entries have been applied.
     COLUMN_MIGRATIONS = [
         (
             "saved_games",
@@ -258,9 +384,15 @@ def _run_column_migrations(cursor: sqlite3.Cursor):
         ("itad_price_cache", "is_family_shared", "BOOLEAN DEFAULT 0", "0"),
     ]
 
+    if cursor.execute("PRAGMA user_version").fetchone()[0] >= len(COLUMN_MIGRATIONS):
+        return
+
+    # Read each table's schema once rather than once per migration entry
+    table_columns: dict[str, set[str]] = {}
     for table, column, definition, update_val in COLUMN_MIGRATIONS:
-        cursor.execute(f"PRAGMA table_info({table})")
-        columns = [col[1] for col in cursor.fetchall()]
+        if table not in table_columns:
+            table_columns[table] = _table_columns(cursor, table)
+        columns = table_columns[table]
 
         if column not in columns:
             logger.info(f"Database: Adding column '{column}' to table '{table}'.")
@@ -270,6 +402,7 @@ def _run_column_migrations(cursor: sqlite3.Cursor):
                     cursor.execute(
                         f"UPDATE {table} SET {column} = {update_val} WHERE {column} IS NULL"
                     )
+                columns.add(column)
                 logger.info(f"Database: Successfully added '{column}' to '{table}'.")
             except sqlite3.OperationalError as e:
                 logger.error(f"Database: Failed to add '{column}' to '{table}': {e}")
@@ -278,6 +411,28 @@ def _run_column_migrations(cursor: sqlite3.Cursor):
                     f"Aborting initialization to prevent partial schema migration."
                 ) from e
 
+    # Committed together with the ALTERs by init_db's transaction
+    cursor.execute(f"PRAGMA user_version = {len(COLUMN_MIGRATIONS)}")
+
+
+def _create_migrated_column_indexes(cursor: sqlite3.Cursor):
+    """Create indexes on columns that older databases only gain via migrations."""
+    # Only non-permanent rows ever expire, so index just those. The WHERE must
+    # match cleanup_expired_cache's predicate for the planner to use it.
+    for table in ("game_details_cache", "itad_price_cache"):
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{table}_expires_at
+            ON {table}(expires_at) WHERE permanent IS NOT 1
+        """)
+        logger.info(f"Database: '{table}' expiry index checked/created.")
+
+    # Recent-games listing orders by detection time
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_saved_games_detected_at
+        ON saved_games(detected_at)
+    """)
+    logger.info("Database: 'saved_games' detected_at index checked/created.")
+
 
 def init_db():
     """Initializes the database schema by creating tables if they don't exist
@@ -286,10 +441,18 @@ def init_db():
         with get_write_connection() as conn:
             cursor = conn.cursor()
 
+            # sqlite3 only opens implicit transactions for DML, so each CREATE TABLE
+            # would otherwise autocommit (and fsync) on its own.
+            cursor.execute("BEGIN")
+            _rebuild_without_rowid_tables(cursor)
             _create_tables(cursor)
             _run_column_migrations(cursor)
+            _create_migrated_column_indexes(cursor)
 
             conn.commit()  # Final commit
+
+            # Give the planner fresh statistics before the first queries run
+            cursor.execute("PRAGMA optimize")
     except sqlite3.Error as e:
         logger.critical(f"Database initialization error: {e}")
         raise RuntimeError("Database initialization failed") from e
@@ -298,42 +461,72 @@ def init_db():
 # === CACHE HELPER FUNCTIONS ===
 
 
-def cleanup_expired_cache():
-    """Remove expired cache entries from all cache tables."""
-    try:
-        with get_write_connection() as conn:
-            cursor = conn.cursor()
+def format_utc_timestamp(dt: datetime) -> str:
+    """Format an aware UTC datetime the way cache timestamps are stored.
 
-            tables = [
-                "game_details_cache",
-                "user_games_cache",
-                "wishlist_cache",
-                "discord_users_cache",
-                "family_library_cache",
-                "itad_price_cache",
-            ]
-
-            total_deleted = 0
-            for table in tables:
-                # Check if table has 'permanent' column
-                cursor.execute(f"PRAGMA table_info({table})")
-                columns = [col[1] for col in cursor.fetchall()]
-
-                query = f"DELETE FROM {table} WHERE expires_at <= STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW')"
-
-                if "permanent" in columns:
-                    # Protect permanent entries from deletion regardless of expires_at
-                    query += " AND (permanent != 1 OR permanent IS NULL)"
-
-                cursor.execute(query)
-                deleted = cursor.rowcount
-                total_deleted += deleted
-                if deleted > 0:
-                    logger.debug(f"Cleaned up {deleted} expired entries from {table}")
+    Always emits milliseconds so stored values sort consistently against each
+    other and against SQLite's STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW').
+    """
+    return dt.isoformat(timespec="milliseconds").replace("+00:00", "Z")
 
-            conn.commit()
-            if total_deleted > 0:
-                logger.info(f"Cache cleanup: removed {total_deleted} expired entries")
+
+def cache_timestamps(cache_hours: float) -> tuple[str, str]:
+    """Return (cached_at, expires_at) strings for an entry cached from now."""
+    now = datetime.now(timezone.utc)
+    return format_utc_timestamp(now), format_utc_timestamp(
+        now + timedelta(hours=cache_hours)
+    )
+
+
+def cleanup_expired_cache(batch_size: int = 5000):
+    """Remove expired cache entries from all cache tables.
+
+    Deletes in batches of batch_size rows, committing and releasing the write
+    lock between batches so a large backlog does not stall other writers.
+    """
+    tables = [
+        "game_details_cache",
+        "user_games_cache",
+        "wishlist_cache",
+        "discord_users_cache",
+        "family_library_cache",
+        "itad_price_cache",
+    ]
+
+    # One cutoff for every table and batch, so a long cleanup does not chase
+    # entries that expire while it runs
+    now = format_utc_timestamp(datetime.now(timezone.utc))
+
+    try:
+        total_deleted = 0
+        for table in tables:
+            expired = "expires_at <= ?"
+            if "permanent" in _table_columns(get_db_connection().cursor(), table):
+                # Protect permanent entries from deletion regardless of expires_at
+                expired += " AND permanent IS NOT 1"
+            key = _WITHOUT_ROWID_TABLES.get(table, "rowid")
+            query = (
+                f"DELETE FROM {table} WHERE {key} IN "
+                f"(SELECT {key} FROM {table} WHERE {expired} LIMIT ?)"
+            )
+
+            table_deleted = 0
+            while True:
+                with get_write_connection() as conn:
+                    deleted = conn.execute(query, (now, batch_size)).rowcount
+                    conn.commit()
+                table_deleted += deleted
+                if not deleted or deleted < batch_size:
+                    break
+
+            total_deleted += table_deleted
+            if table_deleted > 0:
+                logger.debug(f"Cleaned up {table_deleted} expired entries from {table}")
+
+        if total_deleted > 0:
+            logger.info(f"Cache cleanup: removed {total_deleted} expired entries")
+            # Row counts just shifted; let SQLite re-analyze tables if needed
+            get_db_connection().execute("PRAGMA optimize")
     except Exception as e:
         logger.error(f"Error during cache cleanup: {e}")
 
@@ -341,11 +534,15 @@ def cleanup_expired_cache():
 # --- Database-backed migrations ---
 
 
-def _has_migration_run(migration_name: str) -> bool:
-    """Check if a named migration has already been applied."""
+def has_migration_run(
+    migration_name: str, conn: sqlite3.Connection | None = None
+) -> bool:
+    """Check if a named migration has already been applied.
+
+    Pass ``conn`` to check inside a write transaction the caller already holds.
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = (conn or get_db_connection()).cursor()
         cursor.execute("SELECT 1 FROM migrations WHERE name = ?", (migration_name,))
         return cursor.fetchone() is not None
     except sqlite3.OperationalError:
@@ -355,15 +552,24 @@ def _has_migration_run(migration_name: str) -> bool:
         return False
 
 
-def _mark_migration_run(migration_name: str) -> None:
-    """Record that a named migration has been applied."""
+def mark_migration_run(
+    migration_name: str, conn: sqlite3.Connection | None = None
+) -> None:
+    """Record that a named migration has been applied.
+
+    With ``conn`` the record joins the caller's open transaction, so it commits
+    or rolls back together with the migrated rows; errors propagate to the caller.
+    """
+    sql = (
+        "INSERT OR IGNORE INTO migrations (name, applied_at) "
+        "VALUES (?, STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW'))"
+    )
+    if conn is not None:
+        conn.execute(sql, (migration_name,))
+        return
     try:
-        with get_write_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT OR IGNORE INTO migrations (name, applied_at) VALUES (?, STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW'))",
-                (migration_name,),
-            )
-            conn.commit()
+        with get_write_connection() as write_conn:
+            write_conn.execute(sql, (migration_name,))
+            write_conn.commit()
     except Exception:
         logger.exception("Error marking migration %s", migration_name)
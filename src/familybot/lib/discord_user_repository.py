@@ -1,9 +1,12 @@
 # In src/familybot/lib/discord_user_repository.py
 
 import logging
-from datetime import datetime, timedelta, timezone
 
-from familybot.lib.database import get_db_connection, get_write_connection
+from familybot.lib.database import (
+    cache_timestamps,
+    get_db_connection,
+    get_write_connection,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -11,9 +14,7 @@ logger = logging.getLogger(__name__)
 def get_cached_discord_user(discord_id: str):
     """Get cached Discord user info if not expired, returns None if not found or expired."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
+        cursor = get_db_connection().execute(
             """
             SELECT username FROM discord_users_cache
             WHERE discord_id = ? AND expires_at > STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW')
@@ -35,21 +36,19 @@ def cache_discord_user(discord_id: str, username: str, cache_hours: int = 1):
         with get_write_connection() as conn:
             cursor = conn.cursor()
 
-            now = datetime.now(timezone.utc)
-            expires_at = now + timedelta(hours=cache_hours)
+            cached_at, expires_at = cache_timestamps(cache_hours)
 
             cursor.execute(
                 """
-                INSERT OR REPLACE INTO discord_users_cache
+                INSERT INTO discord_users_cache
                 (discord_id, username, cached_at, expires_at)
                 VALUES (?, ?, ?, ?)
+                ON CONFLICT(discord_id) DO UPDATE SET
+                    username = excluded.username,
+                    cached_at = excluded.cached_at,
+                    expires_at = excluded.expires_at
             """,
-                (
-                    discord_id,
-                    username,
-                    now.isoformat().replace("+00:00", "Z"),
-                    expires_at.isoformat().replace("+00:00", "Z"),
-                ),
+                (discord_id, username, cached_at, expires_at),
             )
             conn.commit()
             logger.debug(f"Cached Discord user {discord_id}: {username}")
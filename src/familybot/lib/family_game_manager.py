@@ -6,7 +6,13 @@ import sqlite3
 from datetime import datetime, timezone  # Import datetime to get current time
 
 from familybot.config import PROJECT_ROOT
-from familybot.lib.database import get_db_connection
+from familybot.lib.database import (
+    format_utc_timestamp,
+    get_db_connection,
+    get_write_connection,
+    has_migration_run,
+    mark_migration_run,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +35,16 @@ except Exception as e:
 
 
 def _migrate_gamelist_to_db(conn: sqlite3.Connection):
-    """Internal function to migrate existing gamelist.txt data to the database."""
+    """Internal function to migrate existing gamelist.txt data to the database.
+
+    Runs under an existing write connection and records the 'gamelist_txt_to_db'
+    migration, so the file is only ever read once. On failure the transaction is
+    rolled back and the error re-raised, so no rows are kept without the record.
+    """
+    if has_migration_run("gamelist_txt_to_db", conn):
+        logger.debug("Database: Migration 'gamelist_txt_to_db' already applied.")
+        return
+
     if os.path.exists(OLD_GAME_LIST_FILE_PATH):
         logger.info(
             f"Attempting to migrate games from old file: {OLD_GAME_LIST_FILE_PATH}"
@@ -46,13 +61,11 @@ def _migrate_gamelist_to_db(conn: sqlite3.Connection):
                         )  # Only appid for default timestamp
 
                 if appids_to_insert:
-                    cursor = conn.cursor()
                     # Use INSERT OR IGNORE in case some games already exist from a partial run
-                    cursor.executemany(
+                    conn.executemany(
                         "INSERT OR IGNORE INTO saved_games (appid) VALUES (?)",
                         appids_to_insert,
                     )
-                    conn.commit()
                     logger.info(
                         f"Migrated {len(appids_to_insert)} games from {OLD_GAME_LIST_FILE_PATH} to database."
                     )
@@ -61,38 +74,47 @@ def _migrate_gamelist_to_db(conn: sqlite3.Connection):
                     # logger.info(f"Removed old gamelist file: {OLD_GAME_LIST_FILE_PATH}")
                 else:
                     logger.info("No games found in old gamelist.txt for migration.")
-        except Exception as e:
-            logger.error(
-                f"Error during gamelist.txt migration to DB: {e}", exc_info=True
-            )
+        except Exception:
+            # Discard any rows inserted so far rather than letting the write
+            # connection commit them on its way out
+            conn.rollback()
+            raise
     else:
         logger.info("No old gamelist.txt found for migration. Skipping.")
 
+    # Committed together with the migrated rows
+    mark_migration_run("gamelist_txt_to_db", conn)
+    conn.commit()
+
 
 def get_saved_games() -> list:
     """Reads the list of saved game AppIDs from the database."""
     global _migration_checked
     appids = []
-    conn = None
     try:
-        conn = get_db_connection()
         if not _migration_checked:
-            _migrate_gamelist_to_db(
-                conn
-            )  # Attempt migration if file exists on first read
+            # Attempt migration if file exists on first read, unless a previous
+            # run already recorded it
+            if not has_migration_run("gamelist_txt_to_db"):
+                try:
+                    with get_write_connection() as write_conn:
+                        _migrate_gamelist_to_db(write_conn)
+                except Exception as e:
+                    logger.error(
+                        f"Error during gamelist.txt migration to DB: {e}", exc_info=True
+                    )
             _migration_checked = True
+        conn = get_db_connection()
         cursor = conn.cursor()
         # Select both appid and detected_at for sorting later
         cursor.execute("SELECT appid, detected_at FROM saved_games")
         # Return a list of tuples or dicts, depending on how steam_family expects it.
-        # For sorting, we'll return tuples (appid, detected_at)
-        appids = [(row["appid"], row["detected_at"]) for row in cursor.fetchall()]
+        # For sorting, we'll return tuples (appid, detected_at), built straight
+        # off the cursor rather than from a fetchall() list of Rows
+        appids = [(row["appid"], row["detected_at"]) for row in cursor]
         logger.debug(f"Loaded {len(appids)} games from database.")
     except sqlite3.Error as e:
         logger.error(f"Error reading saved games from DB: {e}")
-    finally:
-        if conn:
-            conn.close()
     return appids
 
 
@@ -101,11 +123,7 @@ def set_saved_games(game_data_list: list) -> None:  # Renamed parameter for clar
     This is cumulative; it adds new games or updates timestamps for existing ones,
     but does NOT remove games that are missing from the input list.
     game_data_list should be a list of (appid, detected_at_timestamp_str) tuples."""
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
         # Prepare data for insertion: (appid, detected_at)
         # If detected_at is not provided, use current timestamp
         appids_to_insert = []
@@ -114,23 +132,22 @@ def set_saved_games(game_data_list: list) -> None:  # Renamed parameter for clar
                 appids_to_insert.append((str(item[0]), str(item[1])))
             else:  # Assume it's just an appid string, use current time
                 appids_to_insert.append(
-                    (
-                        str(item),
-                        datetime.now(timezone.utc)
-                        .isoformat(timespec="milliseconds")
-                        .replace("+00:00", "Z"),
-                    )
+                    (str(item), format_utc_timestamp(datetime.now(timezone.utc)))
                 )
 
-        if appids_to_insert:
-            cursor.executemany(
-                "INSERT OR REPLACE INTO saved_games (appid, detected_at) VALUES (?, ?)",
-                appids_to_insert,
-            )
-        conn.commit()
+        with get_write_connection() as conn:
+            if appids_to_insert:
+                # Most calls resend every known game with its existing timestamp;
+                # the WHERE makes those rows a no-op instead of a delete + insert
+                conn.cursor().executemany(
+                    """
+                    INSERT INTO saved_games (appid, detected_at) VALUES (?, ?)
+                    ON CONFLICT(appid) DO UPDATE SET detected_at = excluded.detected_at
+                    WHERE detected_at IS NOT excluded.detected_at
+                """,
+                    appids_to_insert,
+                )
+            conn.commit()
         logger.info(f"Updated {len(game_data_list)} games in database.")
     except sqlite3.Error as e:
         logger.error(f"Error writing saved games to DB: {e}")
-    finally:
-        if conn:
-            conn.close()
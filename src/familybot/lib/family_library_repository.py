@@ -1,11 +1,15 @@
 # In src/familybot/lib/family_library_repository.py
 
 import logging
-import json
-from datetime import datetime, timedelta, timezone
+
+import orjson
 
 from familybot.config import FAMILY_LIBRARY_CACHE_TTL
-from familybot.lib.database import get_db_connection, get_write_connection
+from familybot.lib.database import (
+    cache_timestamps,
+    get_db_connection,
+    get_write_connection,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -13,30 +17,26 @@ logger = logging.getLogger(__name__)
 def get_cached_family_library():
     """Get cached family library data if not expired, returns None if not found or expired."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
+        cursor = get_db_connection().execute(
             """
             SELECT appid, owner_steamids, exclude_reason FROM family_library_cache
             WHERE expires_at > STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW')
         """,
             (),
         )
-        rows = cursor.fetchall()
-        if rows:
-            family_apps = []
-            for row in rows:
-                family_apps.append(
-                    {
-                        "appid": int(row["appid"]),
-                        "owner_steamids": json.loads(row["owner_steamids"])
-                        if row["owner_steamids"]
-                        else [],
-                        "exclude_reason": row["exclude_reason"],
-                    }
-                )
-            return family_apps
-        return None
+        # Decode straight off the cursor rather than materializing every Row
+        # with fetchall() first
+        family_apps = [
+            {
+                "appid": int(row["appid"]),
+                "owner_steamids": orjson.loads(row["owner_steamids"])
+                if row["owner_steamids"]
+                else [],
+                "exclude_reason": row["exclude_reason"],
+            }
+            for row in cursor
+        ]
+        return family_apps or None
     except Exception as e:
         logger.error(f"Error getting cached family library: {e}")
         return None
@@ -49,32 +49,37 @@ def cache_family_library(
     try:
         with get_write_connection() as conn:
             cursor = conn.cursor()
-            now = datetime.now(timezone.utc)
-            expires_at = now + timedelta(hours=cache_hours)
+            cached_at, expires_at_str = cache_timestamps(cache_hours)
 
-            # Clear existing cache
-            cursor.execute("DELETE FROM family_library_cache")
-
-            # Insert new cache entries
-            cache_entries = []
-            for app in family_apps:
-                cache_entries.append(
-                    (
-                        str(app.get("appid")),
-                        json.dumps(app.get("owner_steamids", [])),
-                        app.get("exclude_reason"),
-                        now.isoformat().replace("+00:00", "Z"),
-                        expires_at.isoformat().replace("+00:00", "Z"),
-                    )
+            # Upsert current entries in place rather than clearing the table;
+            # rows are generated as executemany consumes them
+            cache_entries = (
+                (
+                    str(app.get("appid")),
+                    orjson.dumps(app.get("owner_steamids", [])).decode(),
+                    app.get("exclude_reason"),
+                    cached_at,
+                    expires_at_str,
                 )
+                for app in family_apps
+            )
 
             cursor.executemany(
                 """
                 INSERT INTO family_library_cache (appid, owner_steamids, exclude_reason, cached_at, expires_at)
                 VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(appid) DO UPDATE SET
+                    owner_steamids = excluded.owner_steamids,
+                    exclude_reason = excluded.exclude_reason,
+                    cached_at = excluded.cached_at,
+                    expires_at = excluded.expires_at
             """,
                 cache_entries,
             )
+            # Anything not touched by this refresh has left the family library
+            cursor.execute(
+                "DELETE FROM family_library_cache WHERE cached_at != ?", (cached_at,)
+            )
             conn.commit()
             logger.debug(
                 f"Cached {len(family_apps)} family library apps for {cache_hours} hours"
@@ -7,6 +7,7 @@ from typing import Any
 import aiohttp
 
 from familybot.lib.api_utils import handle_api_response
+from familybot.lib.database import format_utc_timestamp
 from familybot.lib.family_library_repository import (
     cache_family_library,
     get_cached_family_library,
@@ -83,25 +84,20 @@ async def process_new_games(
             if len(game.get("owner_steamids", [])) == 1:
                 game_owner_list[appid] = str(game["owner_steamids"][0])
 
-    saved_games_with_timestamps = get_saved_games()
-    saved_appids = {item[0] for item in saved_games_with_timestamps}
+    # appid -> detected_at, so existing timestamps are a dict lookup rather
+    # than a scan of every saved game per appid
+    saved_timestamps = dict(get_saved_games())
 
-    new_appids = set(game_array) - saved_appids
+    new_appids = set(game_array) - saved_timestamps.keys()
 
     all_games_for_db_update = []
-    current_utc_iso = (
-        datetime.now(timezone.utc)
-        .isoformat(timespec="milliseconds")
-        .replace("+00:00", "Z")
-    )
+    current_utc_iso = format_utc_timestamp(datetime.now(timezone.utc))
 
     for appid in game_array:
         if appid in new_appids:
             all_games_for_db_update.append((appid, current_utc_iso))
         else:
-            found_timestamp = next(
-                (ts for ap, ts in saved_games_with_timestamps if ap == appid), None
-            )
+            found_timestamp = saved_timestamps.get(appid)
             if found_timestamp:
                 all_games_for_db_update.append((appid, found_timestamp))
             else:
@@ -223,9 +219,7 @@ async def process_new_games(
                 # Else: Skip this AppID for now so it remains "new"
             else:
                 # Find existing timestamp from saved games
-                found_timestamp = next(
-                    (ts for ap, ts in saved_games_with_timestamps if ap == appid), None
-                )
+                found_timestamp = saved_timestamps.get(appid)
                 if found_timestamp:
                     final_db_update_list.append((appid, found_timestamp))
                 else:
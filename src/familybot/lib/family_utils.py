@@ -1,10 +1,10 @@
 # In src/familybot/lib/family_utils.py
 
-import json
 import logging
 import asyncio
 
 import aiohttp
+import orjson
 
 from familybot.config import FAMILY_STEAM_ID  # Import FAMILY_USER_DICT here
 from familybot.config import FAMILY_USER_DICT
@@ -40,6 +40,70 @@ def get_family_game_list_url() -> str:
     return url_family_list
 
 
+# Concurrent Steam Store / ITAD requests per format_message call
+MAX_CONCURRENT_LOOKUPS = 5
+
+
+async def _fetch_app_details(
+    session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, app_id: str
+) -> tuple[dict | None, str | None]:
+    """Fetch Steam Store app details for format_message.
+
+    Returns (game_data, None) on success, or (None, reason) with the label shown
+    in the message when the details could not be retrieved.
+    """
+    game_url = (
+        f"https://store.steampowered.com/api/appdetails?appids={app_id}&cc=us&l=fr"
+    )
+    game_info_json = None
+    async with semaphore:
+        try:
+            async with session.get(
+                game_url, timeout=aiohttp.ClientTimeout(total=10)
+            ) as game_info_response:
+                game_info_response.raise_for_status()
+                game_info_json = orjson.loads(await game_info_response.read())
+
+            if game_info_json.get(app_id, {}).get("success"):
+                return game_info_json[app_id]["data"], None
+            logger.warning(
+                f"App details success false for AppID {app_id} in format_message. Response: {game_info_json}"
+            )
+            return None, "Details Unavailable"
+
+        except aiohttp.ClientError as e:
+            logger.error(
+                f"Request error fetching app details for {app_id} in format_message: {e}"
+            )
+            return None, "API Error"
+        except orjson.JSONDecodeError as e:
+            logger.error(
+                f"JSON decode error for app details {app_id} in format_message: {e}."
+            )
+            return None, "Data Error"
+        except KeyError as e:
+            logger.error(
+                f"Missing key in app details for {app_id} in format_message: {e}. Response: {game_info_json}"
+            )
+            return None, "Format Error"
+        except Exception as e:
+            logger.critical(
+                f"Unexpected error fetching app details for {app_id} in format_message: {e}",
+                exc_info=True,
+            )
+            return None, "Unexpected Error"
+
+
+async def _fetch_lowest_price(semaphore: asyncio.Semaphore, app_id: str) -> str | None:
+    """Look up the lowest historical price for format_message, or None on error."""
+    async with semaphore:
+        try:
+            return await asyncio.to_thread(get_lowest_price, int(app_id))
+        except Exception as e:
+            logger.warning(f"Could not get lowest price for {app_id}: {e}")
+            return None
+
+
 async def format_message(
     wishlist: list, *, short: bool = False, cached_data: dict | None = None
 ) -> str:
@@ -49,127 +113,84 @@ async def format_message(
         return "# 📝 Family Wishlist \nNo common wishlist items found to display."
 
     new_cached_data = cached_data or {}
-    async with aiohttp.ClientSession() as session:
-        for item in wishlist:
-            app_id = str(item[0])
-            users_wanting = ", ".join(
-                FAMILY_USER_DICT.get(user_steam_id, f"Unknown User({user_steam_id})")
-                for user_steam_id in item[1]
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_LOOKUPS)
+
+    # Fetch every missing game's details concurrently, then format in order
+    to_fetch = list(
+        dict.fromkeys(
+            str(item[0]) for item in wishlist if str(item[0]) not in new_cached_data
+        )
+    )
+    fetch_errors: dict[str, str] = {}
+    if to_fetch:
+        async with aiohttp.ClientSession() as session:
+            fetched = await asyncio.gather(
+                *(_fetch_app_details(session, semaphore, a) for a in to_fetch)
             )
+        for app_id, (game_data, error) in zip(to_fetch, fetched, strict=True):
+            if game_data is not None:
+                new_cached_data[app_id] = game_data
+            else:
+                fetch_errors[app_id] = error or "Details Unavailable"
 
-            message_parts.append(f"- {users_wanting} want ")
+    lowest_prices: dict[str, str | None] = {}
+    if not short:
+        price_appids = list(
+            dict.fromkeys(
+                str(item[0]) for item in wishlist if str(item[0]) in new_cached_data
+            )
+        )
+        prices = await asyncio.gather(
+            *(_fetch_lowest_price(semaphore, a) for a in price_appids)
+        )
+        lowest_prices = dict(zip(price_appids, prices, strict=True))
 
-            # Use cached data if available
-            if app_id in new_cached_data:
-                game_info_data = new_cached_data[app_id]
-            else:
-                game_url = f"https://store.steampowered.com/api/appdetails?appids={app_id}&cc=us&l=fr"
-                game_info_data = None
-                try:
-                    async with session.get(
-                        game_url, timeout=aiohttp.ClientTimeout(total=10)
-                    ) as game_info_response:
-                        game_info_response.raise_for_status()
-                        text_response = await game_info_response.text()
-                        game_info_json = json.loads(text_response)
-
-                    if game_info_json.get(app_id, {}).get("success"):
-                        game_info_data = game_info_json[app_id]["data"]
-                        new_cached_data[app_id] = game_info_data
-                    else:
-                        logger.warning(
-                            f"App details success false for AppID {app_id} in format_message. Response: {game_info_json}"
-                        )
-                        message_parts.append(
-                            f"**Unknown Game ({app_id})** (Details Unavailable) \n"
-                        )
-                        continue
-
-                except aiohttp.ClientError as e:
-                    logger.error(
-                        f"Request error fetching app details for {app_id} in format_message: {e}"
-                    )
-                    message_parts.append(f"**Unknown Game ({app_id})** (API Error) \n")
-                    continue
-                except json.JSONDecodeError as e:
-                    logger.error(
-                        f"JSON decode error for app details {app_id} in format_message: {e}."
-                    )
-                    message_parts.append(f"**Unknown Game ({app_id})** (Data Error) \n")
-                    continue
-                except KeyError as e:
-                    logger.error(
-                        f"Missing key in app details for {app_id} in format_message: {e}. Response: {game_info_json}"
-                    )
-                    message_parts.append(
-                        f"**Unknown Game ({app_id})** (Format Error) \n"
-                    )
-                    continue
-                except Exception as e:
-                    logger.critical(
-                        f"Unexpected error fetching app details for {app_id} in format_message: {e}",
-                        exc_info=True,
-                    )
-                    message_parts.append(
-                        f"**Unknown Game ({app_id})** (Unexpected Error) \n"
-                    )
-                    continue
-
-            game_name = game_info_data.get("name", f"Unknown Game ({app_id})")
+    for item in wishlist:
+        app_id = str(item[0])
+        users_wanting = ", ".join(
+            FAMILY_USER_DICT.get(user_steam_id, f"Unknown User({user_steam_id})")
+            for user_steam_id in item[1]
+        )
+
+        message_parts.append(f"- {users_wanting} want ")
+
+        if app_id in fetch_errors:
             message_parts.append(
-                f"[{game_name}](<https://store.steampowered.com/app/{app_id}>) \n"
+                f"**Unknown Game ({app_id})** ({fetch_errors[app_id]}) \n"
             )
+            continue
+        game_info_data = new_cached_data[app_id]
+
+        game_name = game_info_data.get("name", f"Unknown Game ({app_id})")
+        message_parts.append(
+            f"[{game_name}](<https://store.steampowered.com/app/{app_id}>) \n"
+        )
 
-            price_overview = game_info_data.get("price_overview")
-            if price_overview and price_overview.get("discount_percent") != 0:
-                final_formatted = price_overview.get("final_formatted", "N/A")
-                discount_percent = price_overview.get("discount_percent", 0)
-                message_parts.append(
-                    f"  **__The game is on sale at {final_formatted} (-{discount_percent}%)__** \n"
-                )
-                if not short:
-                    final_price = price_overview.get("final")  # Price in cents
-                    if final_price is not None and item[1]:
-                        price_per_person = round(final_price / 100 / len(item[1]), 2)
-                        message_parts.append(
-                            f" which is {price_per_person}$ per person \n"
-                        )
-                    try:
-                        lowest_price = await asyncio.to_thread(
-                            get_lowest_price, int(app_id)
-                        )
-                        message_parts.append(
-                            f"   The lowest price ever was {lowest_price}$ \n"
-                        )
-                    except Exception as e:
-                        logger.warning(f"Could not get lowest price for {app_id}: {e}")
-                        message_parts.append("   Lowest price info unavailable. \n")
+        price_overview = game_info_data.get("price_overview")
+        if price_overview and price_overview.get("discount_percent") != 0:
+            final_formatted = price_overview.get("final_formatted", "N/A")
+            discount_percent = price_overview.get("discount_percent", 0)
+            message_parts.append(
+                f"  **__The game is on sale at {final_formatted} (-{discount_percent}%)__** \n"
+            )
+        else:
+            final_formatted = (
+                price_overview.get("final_formatted", "N/A")
+                if price_overview
+                else "N/A"
+            )
+            message_parts.append(f"  The game is at {final_formatted} \n")
+
+        if not short:
+            final_price = price_overview.get("final") if price_overview else None
+            if final_price is not None and item[1]:
+                price_per_person = round(final_price / 100 / len(item[1]), 2)
+                message_parts.append(f" which is {price_per_person}$ per person \n")
+            lowest_price = lowest_prices.get(app_id)
+            if lowest_price is not None:
+                message_parts.append(f"   The lowest price ever was {lowest_price}$ \n")
             else:
-                final_formatted = (
-                    price_overview.get("final_formatted", "N/A")
-                    if price_overview
-                    else "N/A"
-                )
-                message_parts.append(f"  The game is at {final_formatted} \n")
-                if not short:
-                    final_price = (
-                        price_overview.get("final") if price_overview else None
-                    )
-                    if final_price is not None and item[1]:
-                        price_per_person = round(final_price / 100 / len(item[1]), 2)
-                        message_parts.append(
-                            f" which is {price_per_person}$ per person \n"
-                        )
-                    try:
-                        lowest_price = await asyncio.to_thread(
-                            get_lowest_price, int(app_id)
-                        )
-                        message_parts.append(
-                            f"   The lowest price ever was {lowest_price}$ \n"
-                        )
-                    except Exception as e:
-                        logger.warning(f"Could not get lowest price for {app_id}: {e}")
-                        message_parts.append("   Lowest price info unavailable. \n")
+                message_parts.append("   Lowest price info unavailable. \n")
 
     final_message = "".join(message_parts)
 
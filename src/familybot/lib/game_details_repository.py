@@ -1,15 +1,24 @@
 # In src/familybot/lib/game_details_repository.py
 
-import json
 import logging
 import sqlite3
+from collections.abc import Iterator
 from datetime import datetime, timedelta, timezone
 
+import orjson
+
 from familybot.config import GAME_DETAILS_CACHE_TTL
-from familybot.lib.database import get_db_connection, get_write_connection
+from familybot.lib.database import (
+    format_utc_timestamp,
+    get_db_connection,
+    get_write_connection,
+)
 
 logger = logging.getLogger(__name__)
 
+# SQLite limits the number of bound parameters per statement (default 999)
+MAX_CHUNK_SIZE = 900
+
 # --- Normalization Constants ---
 _NORMALIZED_DEFAULTS = {
     "name": "Unknown",
@@ -24,34 +33,49 @@ _NORMALIZED_DEFAULTS = {
 
 _NORMALIZED_KEYS = frozenset(_NORMALIZED_DEFAULTS.keys())
 
+# --- Steam Category IDs ---
+# Multi-player, Online Multi-Player, Online Co-op
+_MULTIPLAYER_CATEGORY_IDS = frozenset({1, 36, 38})
+# Online Co-op
+_COOP_CATEGORY_IDS = frozenset({38})
+# Family Sharing
+_FAMILY_SHARED_CATEGORY_IDS = frozenset({62})
+
 
 def _analyze_game_categories(categories: list) -> tuple[bool, bool, bool]:
     """Analyze Steam categories to determine multiplayer, co-op, and family sharing status."""
-    is_multiplayer = False
-    is_coop = False
-    is_family_shared = False
+    category_ids = {cat.get("id") for cat in categories}
+    return (
+        not category_ids.isdisjoint(_MULTIPLAYER_CATEGORY_IDS),
+        not category_ids.isdisjoint(_COOP_CATEGORY_IDS),
+        not category_ids.isdisjoint(_FAMILY_SHARED_CATEGORY_IDS),
+    )
 
-    for cat in categories:
-        cat_id = cat.get("id")
-        if cat_id == 1:  # Multi-player
-            is_multiplayer = True
-        elif cat_id == 36:  # Online Multi-Player
-            is_multiplayer = True
-        elif cat_id == 38:  # Online Co-op
-            is_multiplayer = True
-            is_coop = True
-        elif cat_id == 62:  # Family Sharing
-            is_family_shared = True
 
-    return is_multiplayer, is_coop, is_family_shared
+def _row_to_game_details(row: sqlite3.Row) -> dict:
+    """Convert a game_details_cache row into the cached details dict."""
+    return {
+        "name": row["name"],
+        "type": row["type"],
+        "is_free": bool(row["is_free"]),
+        "categories": orjson.loads(row["categories"]) if row["categories"] else [],
+        "price_overview": orjson.loads(row["price_data"])
+        if row["price_data"]
+        else None,
+        "is_multiplayer": bool(row["is_multiplayer"])
+        if row["is_multiplayer"] is not None
+        else False,
+        "is_coop": bool(row["is_coop"]) if row["is_coop"] is not None else False,
+        "is_family_shared": bool(row["is_family_shared"])
+        if row["is_family_shared"] is not None
+        else False,
+    }
 
 
 def get_cached_game_details(appid: str):
     """Get cached game details. Returns None if not found. Permanent cache never expires."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
+        cursor = get_db_connection().execute(
             """
             SELECT name, type, is_free, categories, price_data, permanent,
                    is_multiplayer, is_coop, is_family_shared
@@ -62,77 +86,145 @@ def get_cached_game_details(appid: str):
         )
         row = cursor.fetchone()
         if row:
-            return {
-                "name": row["name"],
-                "type": row["type"],
-                "is_free": bool(row["is_free"]),
-                "categories": json.loads(row["categories"])
-                if row["categories"]
-                else [],
-                "price_overview": json.loads(row["price_data"])
-                if row["price_data"]
-                else None,
-                "is_multiplayer": bool(row["is_multiplayer"])
-                if row["is_multiplayer"] is not None
-                else False,
-                "is_coop": bool(row["is_coop"])
-                if row["is_coop"] is not None
-                else False,
-                "is_family_shared": bool(row["is_family_shared"])
-                if row["is_family_shared"] is not None
-                else False,
-            }
+            return _row_to_game_details(row)
         return None
     except Exception as e:
         logger.error(f"Error getting cached game details for {appid}: {e}")
         return None
 
 
-def _do_cache_game_details(
-    cursor: sqlite3.Cursor,
+def _select_cached_rows(columns: str, appids: list[str]) -> Iterator[sqlite3.Row]:
+    """Yield valid (permanent or unexpired) cache rows for appids, one query per chunk."""
+    conn = get_db_connection()
+    for i in range(0, len(appids), MAX_CHUNK_SIZE):
+        chunk = appids[i : i + MAX_CHUNK_SIZE]
+        placeholders = ",".join("?" * len(chunk))
+        yield from conn.execute(
+            f"""
+            SELECT {columns} FROM game_details_cache
+            WHERE appid IN ({placeholders})
+              AND (permanent = 1 OR expires_at > STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW'))
+        """,
+            chunk,
+        )
+
+
+def get_cached_game_details_many(appids: list[str]) -> dict[str, dict]:
+    """Get cached game details for many appids at once, keyed by appid.
+
+    Appids without valid cached details are simply absent from the result.
+    Uses one query per chunk instead of a get_cached_game_details call per game.
+    """
+    if not appids:
+        return {}
+
+    try:
+        return {
+            row["appid"]: _row_to_game_details(row)
+            for row in _select_cached_rows(
+                "appid, name, type, is_free, categories, price_data, permanent, "
+                "is_multiplayer, is_coop, is_family_shared",
+                appids,
+            )
+        }
+    except Exception as e:
+        logger.error(f"Error getting cached game details in bulk: {e}")
+        return {}
+
+
+def get_cached_appids(appids: list[str]) -> set[str]:
+    """Return the subset of appids that have valid (permanent or unexpired) cached details.
+
+    Lets callers skip already-cached games with one query per chunk instead of
+    a get_cached_game_details round-trip per game.
+    """
+    if not appids:
+        return set()
+
+    try:
+        return {row["appid"] for row in _select_cached_rows("appid", appids)}
+    except Exception as e:
+        logger.error(f"Error checking cached game details in bulk: {e}")
+        return set()
+
+
+# Updates existing rows in place rather than REPLACE's delete + re-insert,
+# which would also rewrite every index entry for the row
+_GAME_DETAILS_UPSERT_SQL = """
+    INSERT INTO game_details_cache
+    (appid, name, type, is_free, categories, price_data, is_multiplayer, is_coop, is_family_shared, price_source, cached_at, expires_at, permanent)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(appid) DO UPDATE SET
+        name = excluded.name,
+        type = excluded.type,
+        is_free = excluded.is_free,
+        categories = excluded.categories,
+        price_data = excluded.price_data,
+        is_multiplayer = excluded.is_multiplayer,
+        is_coop = excluded.is_coop,
+        is_family_shared = excluded.is_family_shared,
+        price_source = excluded.price_source,
+        cached_at = excluded.cached_at,
+        expires_at = excluded.expires_at,
+        permanent = excluded.permanent
+"""
+
+
+def _build_game_details_row(
     appid: str,
     game_data: dict,
     permanent: bool,
     cache_hours: int | None,
     price_source: str,
-):
-    """Internal: cache game details using an existing cursor."""
-    now = datetime.now(timezone.utc)
+    now: datetime,
+) -> tuple:
+    """Build the game_details_cache row for one game."""
     expires_at_str = None
     if not permanent and cache_hours:
-        expires_at = now + timedelta(hours=cache_hours)
-        expires_at_str = expires_at.isoformat().replace("+00:00", "Z")
+        expires_at_str = format_utc_timestamp(now + timedelta(hours=cache_hours))
 
     categories = game_data.get("categories", [])
+    price_overview = game_data.get("price_overview")
     is_multiplayer, is_coop, is_family_shared = _analyze_game_categories(categories)
 
-    cursor.execute(
-        """
-        INSERT OR REPLACE INTO game_details_cache
-        (appid, name, type, is_free, categories, price_data, is_multiplayer, is_coop, is_family_shared, price_source, cached_at, expires_at, permanent)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """,
-        (
-            appid,
-            game_data.get("name"),
-            game_data.get("type"),
-            game_data.get("is_free", False),
-            json.dumps(categories),
-            json.dumps(game_data.get("price_overview"))
-            if game_data.get("price_overview")
-            else None,
-            1 if is_multiplayer else 0,
-            1 if is_coop else 0,
-            1 if is_family_shared else 0,
-            price_source,
-            now.isoformat().replace("+00:00", "Z"),
-            expires_at_str,
-            1 if permanent else 0,
-        ),
+    return (
+        appid,
+        game_data.get("name"),
+        game_data.get("type"),
+        game_data.get("is_free", False),
+        orjson.dumps(categories).decode() if categories else "[]",
+        orjson.dumps(price_overview).decode() if price_overview else None,
+        1 if is_multiplayer else 0,
+        1 if is_coop else 0,
+        1 if is_family_shared else 0,
+        price_source,
+        format_utc_timestamp(now),
+        expires_at_str,
+        1 if permanent else 0,
     )
+
+
+def _do_cache_game_details(
+    cursor: sqlite3.Cursor,
+    appid: str,
+    game_data: dict,
+    permanent: bool,
+    cache_hours: int | None,
+    price_source: str,
+):
+    """Cache game details using an existing cursor."""
+    row = _build_game_details_row(
+        appid,
+        game_data,
+        permanent,
+        cache_hours,
+        price_source,
+        datetime.now(timezone.utc),
+    )
+    cursor.execute(_GAME_DETAILS_UPSERT_SQL, row)
     cache_type = "permanently" if permanent else f"for {cache_hours} hours"
     logger.debug(
-        f"Cached game details for {appid} {cache_type} (MP:{is_multiplayer}, Coop:{is_coop}, FS:{is_family_shared})"
+        f"Cached game details for {appid} {cache_type} (MP:{bool(row[6])}, Coop:{bool(row[7])}, FS:{bool(row[8])})"
     )
 
 
@@ -163,6 +255,42 @@ def cache_game_details(
             write_conn.commit()
 
 
+def cache_game_details_bulk(
+    games: list[tuple[str, dict]],
+    permanent: bool = True,
+    cache_hours: int | None = GAME_DETAILS_CACHE_TTL,
+    price_source: str = "store_api",
+    conn: sqlite3.Connection | None = None,
+) -> int:
+    """Cache many (appid, game_data) pairs with one executemany and a single commit.
+
+    If conn is supplied, the caller owns the write lock. Otherwise, acquires it internally.
+    Returns the number of games cached.
+    """
+    if not games:
+        return 0
+
+    now = datetime.now(timezone.utc)
+    rows = [
+        _build_game_details_row(
+            appid, game_data, permanent, cache_hours, price_source, now
+        )
+        for appid, game_data in games
+    ]
+
+    if conn is not None:
+        conn.cursor().executemany(_GAME_DETAILS_UPSERT_SQL, rows)
+        conn.commit()
+    else:
+        with get_write_connection() as write_conn:
+            write_conn.cursor().executemany(_GAME_DETAILS_UPSERT_SQL, rows)
+            write_conn.commit()
+
+    cache_type = "permanently" if permanent else f"for {cache_hours} hours"
+    logger.debug(f"Cached game details for {len(rows)} games {cache_type}")
+    return len(rows)
+
+
 def force_update_game_cache(appid: str, game_data: dict):
     """Force update cached game details even if they already exist."""
     cache_game_details(appid, game_data, permanent=False)
@@ -5,7 +5,11 @@ import sqlite3
 from datetime import datetime, timedelta, timezone
 
 from familybot.config import ITAD_CACHE_TTL
-from familybot.lib.database import get_db_connection, get_write_connection
+from familybot.lib.database import (
+    format_utc_timestamp,
+    get_db_connection,
+    get_write_connection,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -13,9 +17,7 @@ logger = logging.getLogger(__name__)
 def get_cached_itad_price(appid: str):
     """Get cached ITAD price data. Returns None if not found. Permanent cache never expires."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
+        cursor = get_db_connection().execute(
             """
             SELECT lowest_price, lowest_price_formatted, shop_name, permanent,
                    current_price, current_price_formatted, discount_percent,
@@ -71,8 +73,7 @@ def _do_cache_itad_price(
         expires_at_str = None
         permanent_val = 1
     else:
-        expires_at = now + timedelta(hours=cache_hours)
-        expires_at_str = expires_at.isoformat().replace("+00:00", "Z")
+        expires_at_str = format_utc_timestamp(now + timedelta(hours=cache_hours))
         permanent_val = 0
 
     # Map steam_current_price to current_price if present (for ITAD + Steam fallback merge)
@@ -84,22 +85,28 @@ def _do_cache_itad_price(
     if current_price_formatted is None:
         current_price_formatted = price_data.get("steam_current_price_formatted")
 
-    # Preserve existing name if not provided
-    if steam_game_name is None:
-        cursor.execute(
-            "SELECT steam_game_name FROM itad_price_cache WHERE appid = ?", (appid,)
-        )
-        existing_row = cursor.fetchone()
-        if existing_row:
-            steam_game_name = existing_row["steam_game_name"]
-
+    # Upsert in place; COALESCE preserves the existing name if none is provided
     cursor.execute(
         """
-        INSERT OR REPLACE INTO itad_price_cache
+        INSERT INTO itad_price_cache
         (appid, lowest_price, lowest_price_formatted, shop_name, lookup_method, steam_game_name,
          current_price, current_price_formatted, discount_percent, original_price, is_family_shared,
          cached_at, expires_at, permanent)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(appid) DO UPDATE SET
+            lowest_price = excluded.lowest_price,
+            lowest_price_formatted = excluded.lowest_price_formatted,
+            shop_name = excluded.shop_name,
+            lookup_method = excluded.lookup_method,
+            steam_game_name = COALESCE(excluded.steam_game_name, steam_game_name),
+            current_price = excluded.current_price,
+            current_price_formatted = excluded.current_price_formatted,
+            discount_percent = excluded.discount_percent,
+            original_price = excluded.original_price,
+            is_family_shared = excluded.is_family_shared,
+            cached_at = excluded.cached_at,
+            expires_at = excluded.expires_at,
+            permanent = excluded.permanent
     """,
         (
             appid,
@@ -113,7 +120,7 @@ def _do_cache_itad_price(
             price_data.get("discount_percent") or 0,
             price_data.get("original_price"),
             price_data.get("is_family_shared"),
-            now.isoformat().replace("+00:00", "Z"),
+            format_utc_timestamp(now),
             expires_at_str,
             permanent_val,
         ),
@@ -1,6 +1,7 @@
 """IsThereAnyDeal (ITAD) API service for fetching historical low prices."""
 
 import json
+import threading
 
 import requests
 
@@ -10,6 +11,20 @@ from familybot.lib.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# One Session per thread, since get_lowest_price runs on asyncio.to_thread
+# workers and requests does not guarantee Session is thread-safe. Repeated ITAD
+# requests on a thread still reuse pooled keep-alive connections instead of a
+# new TCP + TLS handshake each.
+_local = threading.local()
+
+
+def _get_session() -> requests.Session:
+    """Return this thread's ITAD Session, creating it on first use."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
 
 def get_lowest_price(steam_app_id: int) -> str:
     """Fetches the lowest historical price for a given Steam App ID from IsThereAnyDeal with permanent caching for historical prices."""
@@ -35,7 +50,7 @@ def get_lowest_price(steam_app_id: int) -> str:
     try:
         logger.info(f"Fetching ITAD price from API for Steam App ID: {steam_app_id}")
         url_lookup = f"https://api.isthereanydeal.com/games/lookup/v1?key={ITAD_API_KEY}&appid={steam_app_id}"
-        lookup_response = requests.get(url_lookup, timeout=5)
+        lookup_response = _get_session().get(url_lookup, timeout=5)
         lookup_response.raise_for_status()
         answer_lookup = json.loads(lookup_response.text)
 
@@ -59,7 +74,7 @@ def get_lowest_price(steam_app_id: int) -> str:
         # Use the prices/v3 endpoint for comprehensive price data including historical lows
         url_prices = f"https://api.isthereanydeal.com/games/prices/v3?key={ITAD_API_KEY}&country=US"
         data = [game_id]
-        prices_response = requests.post(url_prices, json=data, timeout=5)
+        prices_response = _get_session().post(url_prices, json=data, timeout=5)
         prices_response.raise_for_status()
         answer_prices = json.loads(prices_response.text)
 
@@ -153,7 +168,9 @@ def prefetch_itad_prices(steam_app_ids: list[str]) -> None:
         try:
             url_lookup = f"https://api.isthereanydeal.com/lookup/id/shop/61/v1?key={ITAD_API_KEY}"
             shop_queries = [f"app/{app_id}" for app_id in chunk_app_ids]
-            lookup_response = requests.post(url_lookup, json=shop_queries, timeout=10)
+            lookup_response = _get_session().post(
+                url_lookup, json=shop_queries, timeout=10
+            )
             lookup_response.raise_for_status()
             answer_lookup = json.loads(lookup_response.text)
 
@@ -196,7 +213,9 @@ def prefetch_itad_prices(steam_app_ids: list[str]) -> None:
         try:
             url_prices = f"https://api.isthereanydeal.com/games/prices/v3?key={ITAD_API_KEY}&country=US"
             uuids_to_fetch = list(uuid_to_appid.keys())
-            prices_response = requests.post(url_prices, json=uuids_to_fetch, timeout=10)
+            prices_response = _get_session().post(
+                url_prices, json=uuids_to_fetch, timeout=10
+            )
             prices_response.raise_for_status()
             answer_prices = json.loads(prices_response.text)
 
@@ -20,6 +20,11 @@ from .web_logging import WebSocketQueueHandler
 # Get the project root directory
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
 
+# Compiled once, since sanitize_log_message runs on every log record
+_STEAM_API_KEY_RE = re.compile(r"\b[A-F0-9]{32}\b", re.IGNORECASE)
+_DISCORD_TOKEN_RE = re.compile(r"\b[A-Za-z0-9+/]{50,}\b")
+_SECRET_RE = re.compile(r"(password|secret|key|token)[\s=:]+[^\s]+", re.IGNORECASE)
+
 
 def sanitize_log_message(message: str) -> str:
     """
@@ -34,20 +39,13 @@ def sanitize_log_message(message: str) -> str:
     # Mask potential API keys (look for long alphanumeric strings)
 
     # Mask Steam API keys (32 character hex strings)
-    message = re.sub(
-        r"\b[A-F0-9]{32}\b", "[STEAM_API_KEY]", message, flags=re.IGNORECASE
-    )
+    message = _STEAM_API_KEY_RE.sub("[STEAM_API_KEY]", message)
 
     # Mask Discord tokens (longer base64-like strings)
-    message = re.sub(r"\b[A-Za-z0-9+/]{50,}\b", "[DISCORD_TOKEN]", message)
+    message = _DISCORD_TOKEN_RE.sub("[DISCORD_TOKEN]", message)
 
     # Mask potential passwords or secrets
-    message = re.sub(
-        r"(password|secret|key|token)[\s=:]+[^\s]+",
-        r"\1=[MASKED]",
-        message,
-        flags=re.IGNORECASE,
-    )
+    message = _SECRET_RE.sub(r"\1=[MASKED]", message)
 
     return message
 
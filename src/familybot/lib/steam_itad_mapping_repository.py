@@ -4,7 +4,11 @@ import logging
 import sqlite3
 from datetime import datetime, timezone
 
-from familybot.lib.database import get_db_connection, get_write_connection
+from familybot.lib.database import (
+    format_utc_timestamp,
+    get_db_connection,
+    get_write_connection,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -42,12 +46,10 @@ def get_cached_itad_ids_bulk(appids: list[str]) -> dict[str, str]:
         return {}
 
     result = {}
-    conn = None
     cursor = None
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = get_db_connection().cursor()
 
         # Process appids in chunks to avoid exceeding SQLite variable limit
         for i in range(0, len(appids), MAX_CHUNK_SIZE):
@@ -72,7 +74,7 @@ def cache_itad_mapping(
     appid: str, itad_id: str, conn: sqlite3.Connection | None = None
 ):
     """Cache a single Steam AppID to ITAD ID mapping."""
-    now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    now = format_utc_timestamp(datetime.now(timezone.utc))
 
     def _do_insert(cursor: sqlite3.Cursor):
         cursor.execute(
@@ -101,7 +103,7 @@ def bulk_cache_itad_mappings(
     if not mappings:
         return 0
 
-    now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    now = format_utc_timestamp(datetime.now(timezone.utc))
 
     def _do_bulk_insert(cursor: sqlite3.Cursor):
         cursor.executemany(
@@ -1,30 +1,37 @@
 # In src/familybot/lib/user_games_repository.py
 
 import logging
-from datetime import datetime, timedelta, timezone
 
 from familybot.config import WISHLIST_CACHE_TTL
-from familybot.lib.database import get_db_connection, get_write_connection
+from familybot.lib.database import (
+    cache_timestamps,
+    get_db_connection,
+    get_write_connection,
+)
 
 logger = logging.getLogger(__name__)
 
 
-def get_cached_user_games(steam_id: str):
-    """Get cached user games if not expired, returns None if not found or expired."""
+def get_cached_user_games(steam_id: str) -> list[str] | None:
+    """Get cached user game appids in numeric order, returns None if not found or expired."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
+        # Appids are numeric, so one comma-joined string can be split in Python
+        # instead of fetching a row per appid. GROUP_CONCAT order is arbitrary;
+        # sorting keeps callers that slice the result deterministic.
+        cursor = get_db_connection().execute(
             """
-            SELECT appid FROM user_games_cache
+            SELECT GROUP_CONCAT(appid, ',') AS appids FROM user_games_cache
             WHERE steam_id = ? AND expires_at > STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW')
         """,
             (steam_id,),
         )
-        rows = cursor.fetchall()
-        if rows:
-            return [row["appid"] for row in rows]
-        return None
+        appids = cursor.fetchone()["appids"]
+        if not appids:
+            return None
+        # Skip non-numeric junk (e.g. "None" stored for an entry without an
+        # appid) rather than letting one bad row fail the whole lookup
+        numeric = (appid for appid in appids.split(",") if appid.isdigit())
+        return sorted(numeric, key=int) or None
     except Exception as e:
         logger.error(f"Error getting cached user games for {steam_id}: {e}")
         return None
@@ -38,31 +45,29 @@ def cache_user_games(
         with get_write_connection() as conn:
             cursor = conn.cursor()
 
-            now = datetime.now(timezone.utc)
-            expires_at = now + timedelta(hours=cache_hours)
+            cached_at, expires_at_str = cache_timestamps(cache_hours)
 
-            # Clear existing cache for this user
-            cursor.execute(
-                "DELETE FROM user_games_cache WHERE steam_id = ?", (steam_id,)
+            # Upsert current entries in place rather than deleting and
+            # re-inserting the user's whole slice of the table; rows are
+            # generated as executemany consumes them
+            cache_entries = (
+                (steam_id, str(appid), cached_at, expires_at_str) for appid in appids
             )
-
-            # Insert new cache entries
-            cache_entries = [
-                (
-                    steam_id,
-                    str(appid),
-                    now.isoformat().replace("+00:00", "Z"),
-                    expires_at.isoformat().replace("+00:00", "Z"),
-                )
-                for appid in appids
-            ]
             cursor.executemany(
                 """
                 INSERT INTO user_games_cache (steam_id, appid, cached_at, expires_at)
                 VALUES (?, ?, ?, ?)
+                ON CONFLICT(steam_id, appid) DO UPDATE SET
+                    cached_at = excluded.cached_at,
+                    expires_at = excluded.expires_at
             """,
                 cache_entries,
             )
+            # Anything not touched by this refresh is no longer in the list
+            cursor.execute(
+                "DELETE FROM user_games_cache WHERE steam_id = ? AND cached_at != ?",
+                (steam_id, cached_at),
+            )
             conn.commit()
             logger.debug(f"Cached {len(appids)} games for user {steam_id}")
     except Exception as e:
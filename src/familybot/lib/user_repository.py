@@ -2,17 +2,59 @@
 
 import logging
 import sqlite3
+import time
 
 from familybot.config import FAMILY_USER_DICT
 from familybot.lib.database import (
-    _has_migration_run,
     get_db_connection,
     get_write_connection,
+    has_migration_run,
+    mark_migration_run,
 )
 from steam.steamid import SteamID
 
 logger = logging.getLogger(__name__)
 
+# Identity lookups are read on most commands but users/family_members rarely
+# change. Only hits are cached, so misses (e.g. a user not registered yet)
+# always go back to the database. Writers in the bot must call
+# invalidate_identity_caches(); writes from other processes (such as
+# scripts/json_database_importer.py rewriting existing users) are picked up
+# once the entry's TTL runs out. Each cache holds at most
+# _IDENTITY_CACHE_MAXSIZE entries, dropping the oldest first.
+_IDENTITY_CACHE_MAXSIZE = 512
+_IDENTITY_CACHE_TTL_SECONDS = 300.0
+_steam_id_by_friendly_name: dict[str, tuple[str, float]] = {}
+_steam_id_by_discord_id: dict[str, tuple[str, float]] = {}
+
+
+def invalidate_identity_caches() -> None:
+    """Clear cached SteamID lookups after users or family_members are written."""
+    _steam_id_by_friendly_name.clear()
+    _steam_id_by_discord_id.clear()
+
+
+def _get_cached_steam_id(cache: dict[str, tuple[str, float]], key: str) -> str | None:
+    """Return a cached SteamID, or None if absent or past its TTL."""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    steam_id, expires_at = entry
+    if expires_at <= time.monotonic():
+        cache.pop(key, None)
+        return None
+    return steam_id
+
+
+def _cache_steam_id(
+    cache: dict[str, tuple[str, float]], key: str, steam_id: str
+) -> None:
+    """Cache a SteamID lookup, evicting the oldest entry when the cache is full."""
+    cache.pop(key, None)
+    if len(cache) >= _IDENTITY_CACHE_MAXSIZE:
+        cache.pop(next(iter(cache)), None)
+    cache[key] = (steam_id, time.monotonic() + _IDENTITY_CACHE_TTL_SECONDS)
+
 
 def _parse_family_config_entry(value) -> tuple[str, str | None]:
     """Parse a family config entry value into (friendly_name, discord_id).
@@ -39,47 +81,43 @@ def sync_family_members_from_config():
     rather than clobbering it to NULL.
     """
     try:
-        with get_write_connection() as conn:
-            cursor = conn.cursor()
-
-            for steam_id, value in FAMILY_USER_DICT.items():
-                friendly_name, discord_id = _parse_family_config_entry(value)
-
-                # For legacy string format (discord_id is None), preserve existing discord_id
-                if discord_id is None:
-                    cursor.execute(
-                        "SELECT discord_id FROM family_members WHERE steam_id = ?",
-                        (steam_id,),
-                    )
-                    existing = cursor.fetchone()
-                    if existing and existing["discord_id"]:
-                        discord_id = existing["discord_id"]
+        members = []
+        for steam_id, value in FAMILY_USER_DICT.items():
+            friendly_name, discord_id = _parse_family_config_entry(value)
+            members.append((steam_id, friendly_name, discord_id))
+            logger.debug(
+                "Syncing family member: '%s' (Steam ID: %s, Discord ID: %s).",
+                friendly_name,
+                steam_id,
+                discord_id,
+            )
 
-                cursor.execute(
-                    "INSERT OR REPLACE INTO family_members (steam_id, friendly_name, discord_id) VALUES (?, ?, ?)",
-                    (steam_id, friendly_name, discord_id),
-                )
-                logger.debug(
-                    "Synced family member: '%s' (Steam ID: %s, Discord ID: %s).",
-                    friendly_name,
-                    steam_id,
-                    discord_id,
-                )
+        with get_write_connection() as conn:
+            # One upsert for all members; a NULL discord_id (legacy string format)
+            # keeps whatever discord_id is already stored.
+            conn.cursor().executemany(
+                """
+                INSERT INTO family_members (steam_id, friendly_name, discord_id)
+                VALUES (?, ?, ?)
+                ON CONFLICT(steam_id) DO UPDATE SET
+                    friendly_name = excluded.friendly_name,
+                    discord_id = COALESCE(excluded.discord_id, discord_id)
+                WHERE friendly_name IS NOT excluded.friendly_name
+                    OR discord_id IS NOT COALESCE(excluded.discord_id, discord_id)
+                """,
+                members,
+            )
 
             conn.commit()
-            logger.info("Family members synchronized from config.yml to database.")
+        invalidate_identity_caches()
+        logger.info("Family members synchronized from config.yml to database.")
     except Exception as e:
         logger.error(f"Error synchronizing family members from config: {e}")
 
 
 def _migrate_family_members_from_config(conn: sqlite3.Connection) -> None:
     """Helper: migrate family members from config.yml under an existing write connection."""
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT 1 FROM migrations WHERE name = ?",
-        ("family_members_from_config",),
-    )
-    if cursor.fetchone() is not None:
+    if has_migration_run("family_members_from_config", conn):
         logger.debug(
             "Database: Migration 'family_members_from_config' already applied. Skipping."
         )
@@ -95,11 +133,10 @@ def _migrate_family_members_from_config(conn: sqlite3.Connection) -> None:
             config_members_to_insert.append((steam_id, friendly_name, discord_id))
 
         if config_members_to_insert:
-            cursor.executemany(
+            conn.executemany(
                 "INSERT OR IGNORE INTO family_members (steam_id, friendly_name, discord_id) VALUES (?, ?, ?)",
                 config_members_to_insert,
             )
-            conn.commit()
             logger.info(
                 f"Database: Migrated {len(config_members_to_insert)} family members from config.yml."
             )
@@ -112,11 +149,10 @@ def _migrate_family_members_from_config(conn: sqlite3.Connection) -> None:
             "Database: config.yml is empty. Skipping family members migration."
         )
 
-    cursor.execute(
-        "INSERT OR IGNORE INTO migrations (name, applied_at) VALUES (?, STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW'))",
-        ("family_members_from_config",),
-    )
+    # Committed together with the migrated members
+    mark_migration_run("family_members_from_config", conn)
     conn.commit()
+    invalidate_identity_caches()
 
 
 def load_family_members_from_db() -> dict:
@@ -127,16 +163,10 @@ def load_family_members_from_db() -> dict:
     members = {}
 
     # Check and run migration in a single write transaction to avoid TOCTOU race
-    if not _has_migration_run("family_members_from_config"):
+    if not has_migration_run("family_members_from_config"):
         with get_write_connection() as write_conn:
-            # Re-check under the write lock to handle concurrent startup
-            cursor = write_conn.cursor()
-            cursor.execute(
-                "SELECT 1 FROM migrations WHERE name = ?",
-                ("family_members_from_config",),
-            )
-            if cursor.fetchone() is None:
-                _migrate_family_members_from_config(write_conn)
+            # Re-checked under the write lock to handle concurrent startup
+            _migrate_family_members_from_config(write_conn)
 
     try:
         conn = get_db_connection()
@@ -167,6 +197,9 @@ def load_family_members_from_db() -> dict:
 
 def get_steam_id_from_friendly_name(friendly_name: str) -> str | None:
     """Retrieves the SteamID associated with a given friendly name from the family_members table."""
+    cached = _get_cached_steam_id(_steam_id_by_friendly_name, friendly_name)
+    if cached is not None:
+        return cached
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -176,6 +209,9 @@ def get_steam_id_from_friendly_name(friendly_name: str) -> str | None:
         )
         result = cursor.fetchone()
         if result:
+            _cache_steam_id(
+                _steam_id_by_friendly_name, friendly_name, result["steam_id"]
+            )
             return result["steam_id"]
         return None
     except Exception as e:
@@ -187,6 +223,9 @@ def get_steam_id_from_discord_id(discord_id: str) -> str | None:
     """Retrieves the SteamID associated with a given Discord ID.
     Checks family_members table first (for config-driven members with discord_id set),
     then falls back to users table (for !register users)."""
+    cached = _get_cached_steam_id(_steam_id_by_discord_id, discord_id)
+    if cached is not None:
+        return cached
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -197,12 +236,14 @@ def get_steam_id_from_discord_id(discord_id: str) -> str | None:
         )
         result = cursor.fetchone()
         if result:
+            _cache_steam_id(_steam_id_by_discord_id, discord_id, result["steam_id"])
             return result["steam_id"]
 
         # Fall back to users table (!register users)
         cursor.execute("SELECT steam_id FROM users WHERE discord_id = ?", (discord_id,))
         result = cursor.fetchone()
         if result:
+            _cache_steam_id(_steam_id_by_discord_id, discord_id, result["steam_id"])
             return result["steam_id"]
 
         return None
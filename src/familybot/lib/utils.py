@@ -118,6 +118,11 @@ class ProgressTracker:
 class TokenBucket:
     """Token bucket rate limiter for controlling API request rates."""
 
+    # Lowest rate on_congestion() may back off to, as a fraction of the base rate
+    MIN_RATE_FACTOR = 0.125
+    # Consecutive successes needed before on_success() doubles a reduced rate
+    RECOVERY_SUCCESSES = 10
+
     def __init__(self, rate: float, capacity: int | None = None):
         """
         Initialize token bucket.
@@ -127,28 +132,54 @@ class TokenBucket:
             capacity: Maximum tokens in bucket (defaults to rate * 10)
         """
         self.rate = rate
+        self.base_rate = rate
+        self._successes = 0
         self.capacity: int = (
             capacity if capacity is not None else max(1, int(rate * 10.0))
         )
-        self.tokens: float = float(self.capacity)
-        self.last_update = time.time()
-        self._lock = asyncio.Lock()
+        # Virtual time by which every token handed out so far has refilled;
+        # "now" means the bucket starts full
+        self.next_available: float = time.monotonic()
 
     async def acquire(self, tokens: int = 1) -> None:
-        """Acquire tokens from the bucket, waiting if necessary."""
-        async with self._lock:
-            now = time.time()
-            # Add tokens based on elapsed time
-            elapsed = now - self.last_update
-            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
-
-            # If we don't have enough tokens, wait
-            if self.tokens < tokens:
-                wait_time = (tokens - self.tokens) / self.rate
-                await asyncio.sleep(wait_time)
-                # After sleep, we have consumed the tokens we waited for
-                self.tokens = 0.0
-                self.last_update = time.time()
-            else:
-                self.tokens -= tokens
-                self.last_update = now
+        """Acquire tokens from the bucket, waiting if necessary.
+
+        No lock is needed: the reservation below runs without an await, so
+        concurrent callers each claim their slot in call order and only then
+        sleep until it arrives.
+        """
+        now = time.monotonic()
+        scheduled = max(now, self.next_available) + tokens / self.rate
+        self.next_available = scheduled
+        # Up to `capacity` tokens may be spent ahead of schedule (burst). The
+        # allowance is measured at the base rate so that a congestion backoff
+        # shrinks the burst window instead of stretching it.
+        delay = scheduled - now - self.capacity / self.base_rate
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_congestion(self) -> None:
+        """Halve the rate after the server pushes back (e.g. HTTP 429)."""
+        self.rate = max(self.base_rate * self.MIN_RATE_FACTOR, self.rate / 2)
+        self._successes = 0
+
+    def on_success(self) -> None:
+        """Count a successful request, stepping a reduced rate back toward the base."""
+        if self.rate >= self.base_rate:
+            return
+        self._successes += 1
+        if self._successes >= self.RECOVERY_SUCCESSES:
+            self.rate = min(self.base_rate, self.rate * 2)
+            self._successes = 0
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given in seconds. Returns None if absent or not numeric."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        # HTTP-date form; callers fall back to their own backoff
+        return None
+    return max(0.0, seconds)
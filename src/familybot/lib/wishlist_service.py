@@ -17,20 +17,13 @@ from familybot.lib.wishlist_repository import cache_wishlist, get_cached_wishlis
 logger = get_logger("wishlist_service")
 
 
-def add_to_wishlist(global_wishlist: list, app_id: str, user_steam_id: str) -> None:
-    """
-    Adds a game app ID to the global wishlist list of lists, tracking users interested.
-    Each item in global_wishlist is [app_id: str, [user_steam_ids: str]].
-    """
-    found = False
-    for item in global_wishlist:
-        if item[0] == app_id:
-            if user_steam_id not in item[1]:
-                item[1].append(user_steam_id)
-            found = True
-            break
-    if not found:
-        global_wishlist.append([app_id, [user_steam_id]])
+def add_to_wishlist_index(
+    wishlist_index: dict[str, list[str]], app_id: str, user_steam_id: str
+) -> None:
+    """Add app_id to the index, recording user_steam_id as interested."""
+    users = wishlist_index.setdefault(app_id, [])
+    if user_steam_id not in users:
+        users.append(user_steam_id)
 
 
 async def collect_wishlists(
@@ -56,7 +49,8 @@ async def collect_wishlists(
         logger.error("STEAMWORKS_API_KEY is not configured for wishlist task.")
         return []
 
-    global_wishlist: list[list] = []
+    # Keyed by app ID so merging each user's wishlist is O(1) per game
+    wishlist_index: dict[str, list[str]] = {}
     if target_user_steam_ids:
         all_unique_steam_ids_to_check = set(target_user_steam_ids)
     else:
@@ -75,7 +69,7 @@ async def collect_wishlists(
                     f"Using cached wishlist for {user_name_for_log} ({len(cached_wishlist)} items)"
                 )
                 for app_id in cached_wishlist:
-                    add_to_wishlist(global_wishlist, app_id, user_steam_id)
+                    add_to_wishlist_index(wishlist_index, app_id, user_steam_id)
                 continue
 
         # If not cached or force_fresh is True, fetch from API
@@ -126,7 +120,7 @@ async def collect_wishlists(
                     continue
 
                 user_wishlist_appids.append(app_id)
-                add_to_wishlist(global_wishlist, app_id, user_steam_id)
+                add_to_wishlist_index(wishlist_index, app_id, user_steam_id)
 
             # Cache the wishlist
             cache_wishlist(user_steam_id, user_wishlist_appids)
@@ -137,7 +131,7 @@ async def collect_wishlists(
                 exc_info=True,
             )
 
-    return global_wishlist
+    return [[app_id, users] for app_id, users in wishlist_index.items()]
 
 
 async def process_wishlist_duplicates(
@@ -179,6 +173,9 @@ async def process_wishlist_duplicates(
 
     # Now process the selected games and fetch their details
     duplicate_games_for_display = []
+    # Details fetched here are handed to format_message so it does not request
+    # the same games from the Store API a second time
+    fetched_game_details: dict[str, dict] = {}
     saved_game_appids = {item[0] for item in get_saved_games()}
 
     for item in games_to_process:
@@ -209,6 +206,7 @@ async def process_wishlist_duplicates(
                     f"No game data found for wishlist AppID {app_id} in app details response."
                 )
                 continue
+            fetched_game_details[str(app_id)] = game_data
 
             # Use cached boolean fields for faster performance
             is_family_shared = game_data.get("is_family_shared", False)
@@ -234,7 +232,9 @@ async def process_wishlist_duplicates(
 
     if duplicate_games_for_display:
         wishlist_message_content = await format_message(
-            duplicate_games_for_display, short=False
+            duplicate_games_for_display,
+            short=False,
+            cached_data=fetched_game_details,
         )
         full_message = message_prefix + wishlist_message_content
         return {
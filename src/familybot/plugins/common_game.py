@@ -1,5 +1,6 @@
 # In src/familybot/plugins/common_game.py
 
+import asyncio
 import json
 import os
 import sqlite3  # Import sqlite3 for specific error handling
@@ -12,6 +13,7 @@ from familybot.config import ADMIN_DISCORD_ID, PROJECT_ROOT, STEAMWORKS_API_KEY
 from familybot.lib.database import (
     cleanup_expired_cache,
     get_db_connection,
+    get_write_connection,
 )
 from familybot.lib.discord_user_repository import (
     cache_discord_user,
@@ -19,12 +21,13 @@ from familybot.lib.discord_user_repository import (
 )
 from familybot.lib.game_details_repository import (
     cache_game_details,
-    get_cached_game_details,
+    get_cached_game_details_many,
 )
 from familybot.lib.user_games_repository import (
     cache_user_games,
     get_cached_user_games,
 )
+from familybot.lib.user_repository import invalidate_identity_caches
 from familybot.lib.logging_config import get_logger
 from familybot.lib.types import FamilyBotClient
 from familybot.lib.discord_utils import truncate_message_list
@@ -62,6 +65,7 @@ def _migrate_users_to_db(conn: sqlite3.Connection):
                         users_to_insert,
                     )
                     conn.commit()
+                    invalidate_identity_caches()
                     logger.info(
                         f"Migrated {len(users_to_insert)} users from {OLD_REGISTER_CSV_PATH} to database."
                     )
@@ -71,6 +75,7 @@ def _migrate_users_to_db(conn: sqlite3.Connection):
                 else:
                     logger.info("No users found in old register.csv for migration.")
         except Exception as e:
+            conn.rollback()
             logger.error(
                 f"Error during register.csv migration to DB: {e}", exc_info=True
             )
@@ -95,7 +100,6 @@ class common_games(Extension):
     async def _load_registered_users(self) -> dict[str, str]:
         """Loads registered users from the database into a dictionary."""
         users = {}
-        conn = None
         try:
             conn = get_db_connection()
             _migrate_users_to_db(conn)  # Attempt migration if file exists on first read
@@ -107,9 +111,6 @@ class common_games(Extension):
         except sqlite3.Error as e:
             logger.error(f"Error reading registered users from DB: {e}")
             await self._send_admin_dm(f"Error reading registered users from DB: {e}")
-        finally:
-            if conn:
-                conn.close()
         return users
 
     """
@@ -137,26 +138,27 @@ class common_games(Extension):
             )
             return
 
-        conn = None
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-
-            # Insert into 'users' table
-            cursor.execute(
-                "INSERT INTO users (discord_id, steam_id) VALUES (?, ?)",
-                (discord_id, steam_id),
-            )
+            # The write connection rolls back if either insert fails
+            with get_write_connection() as conn:
+                cursor = conn.cursor()
+
+                # Insert into 'users' table
+                cursor.execute(
+                    "INSERT INTO users (discord_id, steam_id) VALUES (?, ?)",
+                    (discord_id, steam_id),
+                )
 
-            # Also insert/update 'family_members' table for Web UI display
-            # Use INSERT OR REPLACE to backfill discord_id if member already exists from config
-            friendly_name = ctx.author.display_name
-            cursor.execute(
-                "INSERT OR REPLACE INTO family_members (steam_id, friendly_name, discord_id) VALUES (?, ?, ?)",
-                (steam_id, friendly_name, discord_id),
-            )
+                # Also insert/update 'family_members' table for Web UI display
+                # Use INSERT OR REPLACE to backfill discord_id if member already exists from config
+                friendly_name = ctx.author.display_name
+                cursor.execute(
+                    "INSERT OR REPLACE INTO family_members (steam_id, friendly_name, discord_id) VALUES (?, ?, ?)",
+                    (steam_id, friendly_name, discord_id),
+                )
 
-            conn.commit()
+                conn.commit()
+            invalidate_identity_caches()
             await ctx.send(
                 f"You have been successfully registered as '{friendly_name}'!"
             )
@@ -178,9 +180,6 @@ class common_games(Extension):
                 "An error occurred during registration. Please try again or contact an admin."
             )
             await self._send_admin_dm(f"Error registering user {discord_id} to DB: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     async def _resolve_steam_vanity_url(
         self, vanity_url: str, session: aiohttp.ClientSession | None = None
@@ -460,12 +459,16 @@ class common_games(Extension):
 
         header = "Common Multiplayer Games:\n"
         game_entries = []
+        # Look up every cached game in one go; only misses hit the Store API
+        cached_games = get_cached_game_details_many(
+            [str(game_appid) for game_appid in common_game_appids]
+        )
 
         async with aiohttp.ClientSession() as session:
             for game_appid in common_game_appids:
                 try:
                     # Try to get cached game details first
-                    cached_game = get_cached_game_details(str(game_appid))
+                    cached_game = cached_games.get(str(game_appid))
                     if cached_game:
                         logger.info(
                             f"Using cached game details for AppID: {game_appid}"
@@ -588,7 +591,8 @@ class common_games(Extension):
     async def cleanup_cache_task(self):
         """Periodic task to clean up expired cache entries."""
         logger.info("Running cache cleanup task...")
-        cleanup_expired_cache()
+        # Keep the batched deletes off the event loop
+        await asyncio.to_thread(cleanup_expired_cache)
 
     @listen()
     async def on_startup(self):
@@ -26,7 +26,7 @@ from familybot.lib.types import FamilyBotClient
 from familybot.lib.discord_utils import split_message
 from familybot.lib.itad_service import prefetch_itad_prices
 from familybot.lib.utils import ProgressTracker
-from familybot.lib.wishlist_service import add_to_wishlist
+from familybot.lib.wishlist_service import add_to_wishlist_index
 from familybot.lib.steam_api_manager import SteamAPIManager
 from familybot.lib.steam_helpers import process_game_deal, send_admin_dm
 
@@ -282,12 +282,17 @@ class steam_admin(Extension):
         try:
             current_family_members = load_family_members_from_db()
             all_unique_steam_ids_to_check = set(current_family_members.keys())
-            global_wishlist: list[list] = []
+            wishlist_index: dict[str, list[str]] = {}
             for user_steam_id in all_unique_steam_ids_to_check:
                 cached_wishlist = get_cached_wishlist(user_steam_id)
                 if cached_wishlist is not None:
                     for app_id in cached_wishlist:
-                        add_to_wishlist(global_wishlist, str(app_id), user_steam_id)
+                        add_to_wishlist_index(
+                            wishlist_index, str(app_id), user_steam_id
+                        )
+            global_wishlist = [
+                [app_id, users] for app_id, users in wishlist_index.items()
+            ]
             if not global_wishlist:
                 await ctx.send("❌ No wishlist games found to check for deals.")
                 return
@@ -643,7 +648,8 @@ class steam_admin(Extension):
         try:
             # Step 1: Collect all wishlist data (same as regular refresh)
             logger.info("Full wishlist scan: Starting comprehensive scan...")
-            global_wishlist: list[list] = []
+            # Keyed by app ID so merging each member's wishlist is O(1) per game
+            wishlist_index: dict[str, list[str]] = {}
             current_family_members = load_family_members_from_db()
             all_unique_steam_ids_to_check = set(current_family_members.keys())
 
@@ -660,7 +666,9 @@ class steam_admin(Extension):
                         f"Full scan: Using cached wishlist for {user_name_for_log} ({len(cached_wishlist)} items)"
                     )
                     for app_id in cached_wishlist:
-                        add_to_wishlist(global_wishlist, str(app_id), user_steam_id)
+                        add_to_wishlist_index(
+                            wishlist_index, str(app_id), user_steam_id
+                        )
                     continue
 
                 # If not cached, fetch from API
@@ -702,7 +710,7 @@ class steam_admin(Extension):
                             continue
 
                         user_wishlist_appids.append(app_id)
-                        add_to_wishlist(global_wishlist, app_id, user_steam_id)
+                        add_to_wishlist_index(wishlist_index, app_id, user_steam_id)
 
                     # Cache the wishlist
                     cache_wishlist(user_steam_id, user_wishlist_appids)
@@ -718,11 +726,9 @@ class steam_admin(Extension):
 
             # Step 2: Collect ALL duplicate games (no limit)
             all_duplicate_games: list[list] = []
-            for item in global_wishlist:
-                app_id = item[0]
-                owner_steam_ids = item[1]
+            for app_id, owner_steam_ids in wishlist_index.items():
                 if len(owner_steam_ids) > 1:
-                    all_duplicate_games.append(item)
+                    all_duplicate_games.append([app_id, owner_steam_ids])
 
             if not all_duplicate_games:
                 await ctx.send(
@@ -742,6 +748,9 @@ class steam_admin(Extension):
 
             # Step 3: Process ALL games with slower rate limiting
             duplicate_games_for_display: list = []
+            # Freshly fetched details are reused by format_message; cached ones
+            # are not, since their prices may be a week old
+            fetched_game_details: dict[str, dict] = {}
             saved_game_appids = {item[0] for item in get_saved_games()}
             processed_count = 0
             skipped_count = 0
@@ -806,6 +815,7 @@ class steam_admin(Extension):
 
                             # Cache the game details
                             cache_game_details(app_id, game_data, permanent=False)
+                            fetched_game_details[str(app_id)] = game_data
 
                         # Use cached boolean fields for faster performance
                         is_family_shared = game_data.get("is_family_shared", False)
@@ -848,7 +858,9 @@ class steam_admin(Extension):
 
                 # Generate the message using the same format_message function
                 wishlist_new_message = await format_message(
-                    duplicate_games_for_display, short=False
+                    duplicate_games_for_display,
+                    short=False,
+                    cached_data=fetched_game_details,
                 )
 
                 # Update the pinned message
@@ -16,7 +16,7 @@ from familybot.lib.family_library_repository import (
 )
 from familybot.lib.game_details_repository import (
     cache_game_details,
-    get_cached_game_details,
+    get_cached_game_details_many,
 )
 from familybot.lib.user_repository import (
     get_steam_id_from_friendly_name,
@@ -32,7 +32,7 @@ from familybot.lib.logging_config import get_logger
 from familybot.lib.types import FamilyBotClient
 from familybot.lib.discord_utils import split_message
 from familybot.lib.itad_service import get_lowest_price
-from familybot.lib.wishlist_service import add_to_wishlist
+from familybot.lib.wishlist_service import add_to_wishlist_index
 from familybot.lib.steam_api_manager import SteamAPIManager
 from familybot.lib.steam_helpers import process_game_deal, send_admin_dm
 
@@ -252,10 +252,13 @@ class steam_family(Extension):
                 ):
                     game_array.append(str(game.get("appid")))
 
+            # Look up every cached game in one go; only misses hit the Store API
+            cached_games = get_cached_game_details_many(game_array)
+
             async with aiohttp.ClientSession() as session:
                 for game_appid in game_array:
                     # Try to get cached game details first
-                    cached_game = get_cached_game_details(game_appid)
+                    cached_game = cached_games.get(game_appid)
                     if cached_game:
                         logger.info(
                             f"Using cached game details for AppID: {game_appid}"
@@ -384,7 +387,7 @@ class steam_family(Extension):
             user_name_for_log = ctx.author.username  # Use Discord username for logging
 
             # Collect wishlist games for the calling user only
-            global_wishlist: list[list] = []
+            wishlist_index: dict[str, list[str]] = {}
 
             # Try to get cached wishlist first
             cached_wishlist = get_cached_wishlist(user_steam_id)
@@ -393,7 +396,7 @@ class steam_family(Extension):
                     f"Deals: Using cached wishlist for {user_name_for_log} ({len(cached_wishlist)} items)"
                 )
                 for app_id in cached_wishlist:
-                    add_to_wishlist(global_wishlist, str(app_id), user_steam_id)
+                    add_to_wishlist_index(wishlist_index, str(app_id), user_steam_id)
             else:
                 # If not cached, fetch fresh wishlist data from API
                 if (
@@ -455,7 +458,7 @@ class steam_family(Extension):
                             continue
                         app_id = str(raw_app_id)
                         user_wishlist_appids.append(app_id)
-                        add_to_wishlist(global_wishlist, app_id, user_steam_id)
+                        add_to_wishlist_index(wishlist_index, app_id, user_steam_id)
 
                     # Cache the wishlist
                     cache_wishlist(user_steam_id, user_wishlist_appids)
@@ -475,6 +478,9 @@ class steam_family(Extension):
                     )
                     return
 
+            global_wishlist = [
+                [app_id, users] for app_id, users in wishlist_index.items()
+            ]
             if not global_wishlist:
                 await loading_message.edit(
                     content="📭 No wishlist games found to check for deals."
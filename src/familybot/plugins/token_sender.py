@@ -2,12 +2,12 @@
 
 import base64
 import binascii
-import json
 import logging
 import re
 import os
 from datetime import datetime
 
+import orjson
 from interactions import Extension, IntervalTrigger, Task, listen
 from interactions.ext.prefixed_commands import PrefixedContext, prefixed_command
 
@@ -170,14 +170,12 @@ class token_sender(Extension):
 
             # Decode token to get expiry time
             try:
-                coded_string = token.split(".")[1]
-                # Pad and replace URL-safe chars for base64 decoding
-                padded_coded_string = coded_string.replace("-", "+").replace("_", "/")
-                padded_coded_string += "=" * (-len(padded_coded_string) % 4)
+                # Decode the URL-safe payload segment as bytes and hand it straight
+                # to orjson, which parses bytes without an intermediate str.
+                coded_segment = token.split(".", 2)[1].encode("ascii")
+                coded_segment += b"=" * (-len(coded_segment) & 3)
 
-                key_info = json.loads(
-                    base64.b64decode(padded_coded_string).decode("utf-8")
-                )
+                key_info = orjson.loads(base64.urlsafe_b64decode(coded_segment))
                 exp_timestamp = key_info["exp"]
 
                 # Save expiry time
@@ -192,7 +190,12 @@ class token_sender(Extension):
 
                 return True
 
-            except (IndexError, json.JSONDecodeError, binascii.Error) as e:
+            except (
+                IndexError,
+                UnicodeEncodeError,
+                orjson.JSONDecodeError,
+                binascii.Error,
+            ) as e:
                 logger.error(f"Error decoding token: {e}")
                 await self._send_admin_dm(f"Error decoding new token: {e}")
                 return False
@@ -8,11 +8,8 @@ from familybot.lib.database import get_db_connection
 
 def get_db():
     """
-    Yield a SQLite connection for use in a request, closing it afterwards.
-    Passed via FastAPI's Depends() mechanism.
+    Yield the thread's pooled SQLite connection for use in a request.
+    Passed via FastAPI's Depends() mechanism. The connection is reused across
+    requests, so it is deliberately not closed here.
     """
-    conn = get_db_connection()
-    try:
-        yield conn
-    finally:
-        conn.close()
+    yield get_db_connection()
@@ -3,12 +3,13 @@
 Cache inspection and purge endpoints.
 """
 
+import asyncio
 import logging
 import sqlite3
 
 from fastapi import APIRouter, Depends, HTTPException
 
-from familybot.lib.database import cleanup_expired_cache
+from familybot.lib.database import cleanup_expired_cache, get_write_connection
 from familybot.web.dependencies import get_db
 from familybot.web.models import CacheStats, CommandResponse
 from familybot.web.state import update_last_activity
@@ -48,11 +49,9 @@ async def get_cache_stats(conn=Depends(get_db)):
 
 @router.post("/api/cache/purge", response_model=CommandResponse)
 async def purge_cache(cache_type: str = "all"):
-    from familybot.lib.database import get_write_connection
-
     try:
         if cache_type == "expired":
-            cleanup_expired_cache()
+            await asyncio.to_thread(cleanup_expired_cache)
             update_last_activity()
             return CommandResponse(
                 success=True, message="Expired cache entries cleaned up"
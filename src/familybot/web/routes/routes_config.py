@@ -58,9 +58,8 @@ async def get_config_data():
         )
 
         # Now try to get family_members_count with its own try/except
-        conn = get_db_connection()
+        cursor = get_db_connection().cursor()
         try:
-            cursor = conn.cursor()
             cursor.execute("SELECT COUNT(*) FROM family_members")
             family_count = cursor.fetchone()[0]
             config_data.family_members_count = family_count
@@ -68,7 +67,7 @@ async def get_config_data():
             logger.exception("Error querying family_members count")
             config_data.family_members_count = 0  # Safe default
         finally:
-            conn.close()
+            cursor.close()
 
         return config_data
     except Exception:
@@ -7,6 +7,7 @@ Game-related API endpoints:
 """
 
 import asyncio
+import json
 import logging
 
 import aiohttp
@@ -15,8 +16,9 @@ from pydantic import BaseModel
 
 from familybot.lib.family_library_repository import get_cached_family_library
 from familybot.lib.game_details_repository import (
-    cache_game_details,
+    cache_game_details_bulk,
     get_cached_game_details,
+    get_cached_game_details_many,
 )
 from familybot.web.dependencies import get_db
 from familybot.web.models import GameDetails
@@ -63,8 +65,6 @@ async def get_family_library(limit: int = 50):
 @router.get("/api/recent-games", response_model=list[GameDetails])
 async def get_recent_games(limit: int = 10, conn=Depends(get_db)):
     """Return the most recently detected family library additions."""
-    import json
-
     # Clamp limit to prevent negative or huge values
     limit = max(1, min(limit, 100))
 
@@ -148,8 +148,9 @@ async def get_game_info_batch(body: GameInfoBatchRequest):
     to_fetch: list[str] = []
 
     # Cache pass
+    cached_games = get_cached_game_details_many(appids)
     for appid in appids:
-        cached = get_cached_game_details(appid)
+        cached = cached_games.get(appid)
         if cached and cached.get("name"):
             results[appid] = GameInfoItem(
                 appid=appid,
@@ -164,6 +165,8 @@ async def get_game_info_batch(body: GameInfoBatchRequest):
 
     # Steam Store API pass
     semaphore = asyncio.Semaphore(5)
+    # Written in one transaction once all fetches finish
+    to_cache: list[tuple[str, dict]] = []
 
     async def fetch_one(
         session: aiohttp.ClientSession, appid: str
@@ -183,7 +186,7 @@ async def get_game_info_batch(body: GameInfoBatchRequest):
 
                 game_data = data.get(str(appid), {}).get("data")
                 if game_data:
-                    cache_game_details(appid, game_data, permanent=False)
+                    to_cache.append((appid, game_data))
                     return appid, GameInfoItem(
                         appid=appid,
                         name=game_data.get("name"),
@@ -197,6 +200,12 @@ async def get_game_info_batch(body: GameInfoBatchRequest):
     async with aiohttp.ClientSession() as session:
         fetched = await asyncio.gather(*[fetch_one(session, a) for a in to_fetch])
 
+    if to_cache:
+        try:
+            await asyncio.to_thread(cache_game_details_bulk, to_cache, permanent=False)
+        except Exception as exc:
+            logger.warning("game-info/batch: failed to cache details: %s", exc)
+
     for appid, info in fetched:
         results[appid] = info
 
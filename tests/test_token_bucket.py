@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from familybot.lib import utils
+from familybot.lib.utils import TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze time.monotonic and record every sleep the bucket asks for."""
+    state = {"now": 1000.0, "sleeps": []}
+
+    async def fake_sleep(delay):
+        state["sleeps"].append(delay)
+
+    monkeypatch.setattr(utils.time, "monotonic", lambda: state["now"])
+    monkeypatch.setattr(utils.asyncio, "sleep", fake_sleep)
+    return state
+
+
+def _drain(bucket, count):
+    async def run():
+        for _ in range(count):
+            await bucket.acquire()
+
+    asyncio.run(run())
+
+
+def test_burst_is_free_then_paced(clock):
+    bucket = TokenBucket(rate=2.0, capacity=4)
+    _drain(bucket, 5)
+    assert clock["sleeps"] == [pytest.approx(0.5)]
+
+
+def test_congestion_slows_requests_down(clock):
+    bucket = TokenBucket(rate=2.0, capacity=4)
+    _drain(bucket, 6)
+    before = list(clock["sleeps"])
+    assert before == [pytest.approx(0.5), pytest.approx(1.0)]
+
+    bucket.on_congestion()
+    clock["sleeps"].clear()
+    _drain(bucket, 2)
+
+    # Each further request is now spaced at the halved rate (1s apart) on top of
+    # the backlog, so every wait is longer than anything seen before the backoff.
+    assert clock["sleeps"] == [pytest.approx(2.0), pytest.approx(3.0)]
+    assert min(clock["sleeps"]) > max(before)
+
+
+def test_congestion_shrinks_the_burst(clock):
+    bucket = TokenBucket(rate=2.0, capacity=4)
+    bucket.on_congestion()
+    _drain(bucket, 5)
+    # The burst window stays at capacity / base_rate (2s), which at the halved
+    # rate covers only two requests; the rest wait a second apart.
+    assert clock["sleeps"] == [
+        pytest.approx(1.0),
+        pytest.approx(2.0),
+        pytest.approx(3.0),
+    ]